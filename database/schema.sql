@@ -108,6 +108,9 @@ CREATE TABLE IF NOT EXISTS metadata (
 CREATE INDEX IF NOT EXISTS idx_river_region_id ON rivers(region_id);
 CREATE INDEX IF NOT EXISTS idx_fly_river_id ON recommended_flies(river_id);
 CREATE INDEX IF NOT EXISTS idx_regulation_river_id ON regulations(river_id);
+-- Child-side FK indexes so ON DELETE CASCADE from sections avoids full scans
+CREATE INDEX IF NOT EXISTS idx_fly_section_id ON recommended_flies(section_id);
+CREATE INDEX IF NOT EXISTS idx_regulation_section_id ON regulations(section_id);
 CREATE INDEX IF NOT EXISTS idx_metadata_entity ON metadata(entity_type, entity_id, crawl_timestamp);
 CREATE INDEX IF NOT EXISTS idx_canonical_url_river ON rivers(canonical_url);
 CREATE INDEX IF NOT EXISTS idx_canonical_url_region ON regions(canonical_url);
@@ -9,7 +9,7 @@ import sys
 
 from .config import Config
 from .logger import ScraperLogger
-from .storage import Storage
+from .storage import Storage, content_hash
 from .fetcher import Fetcher
 from .parser import Parser
 from .exceptions import ConfigError, HaltError
@@ -220,37 +220,67 @@ def scrape_command(args, config: Config, logger: ScraperLogger):
                     print(f"    Error: Could not parse river page: {e}")
                     continue
 
-                # Store flies
-                flies_stored = 0
-                for fly_data in details["flies"]:
-                    try:
-                        storage.insert_fly(
-                            river_id=river["id"],
-                            name=fly_data["name"],
-                            raw_text=fly_data["raw_text"],
-                            category=fly_data.get("category"),
-                            size=fly_data.get("size"),
-                            color=fly_data.get("color"),
-                            crawl_timestamp=datetime.utcnow().isoformat() + "Z",
-                        )
-                        flies_stored += 1
-                    except Exception as e:
-                        logger.error(f"Failed to store fly '{fly_data['name']}': {e}")
+                # Store flies (one transaction per river page)
+                crawl_timestamp = datetime.utcnow().isoformat() + "Z"
+                flies = [
+                    {
+                        "river_id": river["id"],
+                        "name": fly_data["name"],
+                        "raw_text": fly_data["raw_text"],
+                        "category": fly_data.get("category"),
+                        "size": fly_data.get("size"),
+                        "color": fly_data.get("color"),
+                        "crawl_timestamp": crawl_timestamp,
+                    }
+                    for fly_data in details["flies"]
+                ]
+                try:
+                    flies_stored = len(storage.batch_insert_flies(flies))
+                except Exception as e:
+                    # Article 4.4: retry row by row so one bad fly doesn't drop the rest
+                    logger.warning(
+                        f"Batch store of {len(flies)} flies for river {river['id']} "
+                        f"({river['canonical_url']}) failed, retrying per fly: {e}"
+                    )
+                    flies_stored = 0
+                    for fly in flies:
+                        try:
+                            storage.insert_fly(fly)
+                            flies_stored += 1
+                        except Exception as e:
+                            logger.error(
+                                f"Failed to store fly '{fly['name']}' for river "
+                                f"{river['canonical_url']}: {e}"
+                            )
 
                 # Store regulations
-                regs_stored = 0
-                for reg_data in details["regulations"]:
-                    try:
-                        storage.insert_regulation(
-                            river_id=river["id"],
-                            type=reg_data["type"],
-                            value=reg_data["value"],
-                            raw_text=reg_data["raw_text"],
-                            crawl_timestamp=datetime.utcnow().isoformat() + "Z",
-                        )
-                        regs_stored += 1
-                    except Exception as e:
-                        logger.error(f"Failed to store regulation: {e}")
+                regulations = [
+                    {
+                        "river_id": river["id"],
+                        "type": reg_data["type"],
+                        "value": reg_data["value"],
+                        "raw_text": reg_data["raw_text"],
+                        "crawl_timestamp": crawl_timestamp,
+                    }
+                    for reg_data in details["regulations"]
+                ]
+                try:
+                    regs_stored = len(storage.batch_insert_regulations(regulations))
+                except Exception as e:
+                    logger.warning(
+                        f"Batch store of {len(regulations)} regulations for river {river['id']} "
+                        f"({river['canonical_url']}) failed, retrying per regulation: {e}"
+                    )
+                    regs_stored = 0
+                    for regulation in regulations:
+                        try:
+                            storage.insert_regulation(regulation)
+                            regs_stored += 1
+                        except Exception as e:
+                            logger.error(
+                                f"Failed to store regulation '{regulation['raw_text']}' for river "
+                                f"{river['canonical_url']}: {e}"
+                            )
 
                 # Update river with new crawl timestamp and description
                 try:
@@ -265,13 +295,11 @@ def scrape_command(args, config: Config, logger: ScraperLogger):
                         crawl_timestamp=datetime.utcnow().isoformat() + "Z",
                     )
                 except Exception as e:
-                    logger.error(f"Failed to update river: {e}")
+                    logger.error(f"Failed to update river {river['canonical_url']}: {e}")
 
                 # Store metadata for change detection
                 try:
-                    import hashlib
-
-                    raw_hash = hashlib.md5(html.encode()).hexdigest()
+                    raw_hash = content_hash(html)
                     storage.insert_metadata(
                         session_id=f"scrape-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}",
                         entity_id=river["id"],
@@ -280,7 +308,9 @@ def scrape_command(args, config: Config, logger: ScraperLogger):
                         crawl_timestamp=datetime.utcnow().isoformat() + "Z",
                     )
                 except Exception as e:
-                    logger.error(f"Failed to store metadata: {e}")
+                    logger.error(
+                        f"Failed to store metadata for river {river['canonical_url']}: {e}"
+                    )
 
                 # Count fields with data vs null (Article 5.2 compliance)
                 fields_with_data = sum(
@@ -542,6 +572,8 @@ Examples:
         logger.error(f"Unexpected error: {e}")
         print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        logger.close()
 
 
 if __name__ == "__main__":
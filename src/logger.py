@@ -5,11 +5,87 @@ Article 9 Compliance: Complete request logging, JSON format, no sensitive data.
 
 import json
 import logging
+import queue
 import sys
-from datetime import datetime
+import threading
+import time
+import weakref
 from pathlib import Path
 from typing import Optional
 
+# Background writer tuning: flush when this many lines are pending or after this long
+_BATCH_SIZE = 256
+_FLUSH_INTERVAL = 0.05
+
+# Longest flush() waits between checks that the writer thread is still alive
+_FLUSH_POLL = 0.5
+
+# Queue control item telling the writer thread to exit
+_STOP = object()
+
+
+def _ts() -> str:
+    """Current UTC time as ISO 8601 with microseconds and a Z suffix."""
+    secs, ns = divmod(time.time_ns(), 1_000_000_000)
+    t = time.gmtime(secs)
+    return (
+        f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+        f"T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}.{ns // 1000:06d}Z"
+    )
+
+
+def _write_lines(entries: list, console_logger: logging.Logger):
+    """Append (path, line) entries to their log files, one open per file."""
+    by_path = {}
+    for path, line in entries:
+        by_path.setdefault(path, []).append(line)
+
+    for path, lines in by_path.items():
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+        except OSError as e:
+            console_logger.error(f"Failed to write log file {path}: {e}")
+
+
+def _drain(entries: queue.SimpleQueue, console_logger: logging.Logger):
+    """
+    Writer thread: batch queued lines and append them to disk.
+
+    Module-level (no reference to the ScraperLogger) so an unclosed logger
+    can still be garbage collected, which stops its thread via the finalizer.
+    """
+    while True:
+        batch = [entries.get()]
+        deadline = time.monotonic() + _FLUSH_INTERVAL
+
+        # Keep collecting until the batch is full, the interval elapses,
+        # or a control item (flush/stop) asks for an immediate write
+        while len(batch) < _BATCH_SIZE and isinstance(batch[-1], tuple):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(entries.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        _write_lines([item for item in batch if isinstance(item, tuple)], console_logger)
+
+        for item in batch:
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+
+
+def _stop_writer(entries: queue.SimpleQueue, writer: threading.Thread):
+    """Drain everything queued so far, then end the writer thread."""
+    entries.put(_STOP)
+    # A garbage-collection finalizer can fire on the writer thread itself
+    if writer is not threading.current_thread():
+        writer.join()
+
 
 class ScraperLogger:
     """Structured JSON logger for scraper operations."""
@@ -36,12 +112,54 @@ class ScraperLogger:
             )
             self.console_logger.addHandler(console_handler)
 
-    def _write_json_log(self, event_data: dict):
-        """Write structured JSON log entry to file."""
-        event_data["timestamp"] = datetime.utcnow().isoformat() + "Z"
+        # JSON lines are serialized by callers and written in batches by a daemon thread
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        # Held around the closed check + put so nothing is queued behind _STOP
+        self._lock = threading.Lock()
+        self._writer = threading.Thread(
+            target=_drain,
+            args=(self._queue, self.console_logger),
+            name="scraper-log-writer",
+            daemon=True,
+        )
+        self._writer.start()
+        # Stops the writer on close(), garbage collection or interpreter exit,
+        # without an atexit reference keeping this logger alive
+        self._finalizer = weakref.finalize(self, _stop_writer, self._queue, self._writer)
 
-        with open(self.log_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(event_data) + "\n")
+    def _write_json_log(self, event_data: dict):
+        """Queue structured JSON log entry for the background writer."""
+        event_data["timestamp"] = _ts()
+        line = json.dumps(event_data) + "\n"
+
+        with self._lock:
+            if not self._closed:
+                # Path captured now so reassigning log_path only affects later entries
+                self._queue.put((self.log_path, line))
+                return
+        _write_lines([(self.log_path, line)], self.console_logger)
+
+    def flush(self):
+        """Block until every queued log entry is on disk (or the writer thread has died)."""
+        with self._lock:
+            if self._closed:
+                return
+            done = threading.Event()
+            self._queue.put(done)
+        # Give up if the writer died rather than waiting forever
+        while not done.wait(_FLUSH_POLL):
+            if not self._writer.is_alive():
+                return
+
+    def close(self):
+        """Flush pending entries and stop the writer thread (idempotent)."""
+        with self._lock:
+            if self._closed:
+                return
+            # Later entries are written synchronously; everything queued so far drains first
+            self._closed = True
+        self._finalizer()
 
     def log_request(
         self,
@@ -3,9 +3,38 @@ Data models for NZ Flyfishing Web Scraper.
 Article 6 Compliance: Raw data immutability, validation rules.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, FrozenSet, Optional, Tuple
+
+
+class _RecordAccess:
+    """
+    Read-only mapping-style access to a dataclass record.
+
+    Lets slotted records stand in where plain dicts were used: record["name"],
+    record.get("slug"), "name" in record, and dict(record) / **record via keys().
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__dataclass_fields__
+
+    def get(self, key: str, default=None):
+        """Return the field value, or default if the record has no such field."""
+        if key not in self.__dataclass_fields__:
+            return default
+        return getattr(self, key)
+
+    def keys(self):
+        """Field names, in declaration order."""
+        return self.__dataclass_fields__.keys()
 
 
 @dataclass
@@ -33,8 +62,8 @@ class Region:
             raise ValueError("Region canonical_url must be a valid HTTP(S) URL")
 
 
-@dataclass
-class River:
+@dataclass(slots=True)
+class River(_RecordAccess):
     """Represents a river within a region."""
 
     name: str
@@ -82,8 +111,8 @@ class Section:
             raise ValueError("Section must have a river_id")
 
 
-@dataclass
-class Fly:
+@dataclass(slots=True)
+class Fly(_RecordAccess):
     """Represents a recommended fly pattern."""
 
     name: str
@@ -109,8 +138,8 @@ class Fly:
             raise ValueError("Fly must have a river_id")
 
 
-@dataclass
-class Regulation:
+@dataclass(slots=True)
+class Regulation(_RecordAccess):
     """Represents a regulation or condition for a river."""
 
     type: str
@@ -158,3 +187,24 @@ class Metadata:
             raise ValueError("Metadata entity_type cannot be empty")
         if not self.crawl_timestamp:
             raise ValueError("Metadata crawl_timestamp cannot be empty (Article 6.3)")
+
+
+@dataclass(frozen=True)
+class ParseResult:
+    """Immutable sequence of parsed discovery records (e.g. regions from the index page)."""
+
+    records: Tuple[Dict, ...] = ()
+    names: FrozenSet[str] = field(init=False)
+
+    def __post_init__(self):
+        """Precompute the set of record names."""
+        object.__setattr__(self, "names", frozenset(r["name"] for r in self.records))
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
@@ -3,11 +3,179 @@ HTML parser module for NZ Flyfishing Web Scraper.
 Article 5 Compliance: No inference, raw + structured separation.
 """
 
-from typing import Dict, List, Optional
-
-from bs4 import BeautifulSoup
+import functools
+import re
+import sys
+import unicodedata
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+from urllib.parse import quote, unquote, urlparse
+
+import lxml.html
+from lxml import etree
+from cssselect import HTMLTranslator
+from lxml.html import HtmlElement
 
 from .exceptions import ParserError
+from .models import ParseResult, River
+
+# Shared recovering HTML parser (lxml.html flavour, so elements support cssselect)
+_HTML_PARSER = lxml.html.HTMLParser(recover=True)
+
+# Classification vocabulary (interned so returned values share one object per label)
+CAT_NYMPH = sys.intern("nymph")
+CAT_DRY = sys.intern("dry")
+CAT_STREAMER = sys.intern("streamer")
+CAT_WET = sys.intern("wet")
+
+REG_CATCH = sys.intern("catch_limit")
+REG_SEASON = sys.intern("season_dates")
+REG_METHOD = sys.intern("method")
+REG_PERMIT = sys.intern("permit_required")
+REG_FLOW = sys.intern("flow_status")
+REG_UNCLASSIFIED = sys.intern("unclassified")
+
+FLOW_LOW = sys.intern("low")
+FLOW_MEDIUM = sys.intern("medium")
+FLOW_HIGH = sys.intern("high")
+
+FLY_COLORS = tuple(
+    sys.intern(c)
+    for c in (
+        "black",
+        "brown",
+        "olive",
+        "gray",
+        "grey",
+        "white",
+        "red",
+        "yellow",
+        "orange",
+        "green",
+        "blue",
+        "purple",
+        "pink",
+        "tan",
+        "gold",
+        "silver",
+    )
+)
+
+# Slug normalization: separators become "-", other non slug-safe ASCII is deleted.
+# Non-ASCII is dropped before translation, so one table covers every character.
+_SLUG_SEPARATORS = " /_&"
+_SLUG_SAFE = frozenset("abcdefghijklmnopqrstuvwxyz0123456789-")
+_SLUG_TABLE = str.maketrans(
+    {
+        chr(code): ("-" if chr(code) in _SLUG_SEPARATORS else None)
+        for code in range(128)
+        if chr(code) not in _SLUG_SAFE
+    }
+)
+
+
+# Fly classification patterns, checked in priority order
+_CATEGORY_PATTERNS = (
+    (CAT_NYMPH, re.compile(r"nymph|hare|pheasant tail|prince")),
+    (CAT_DRY, re.compile(r"dry|wulff|adams|elk hair|parachute")),
+    (CAT_STREAMER, re.compile(r"streamer|bugger|woolly|muddler|zonker")),
+    (CAT_WET, re.compile(r"wet|soft hackle")),
+)
+_SIZE_HASH_RE = re.compile(r"#(\d+)")
+_SIZE_WORD_RE = re.compile(r"size\s+(\d+)")
+# Lookahead so overlapping mentions (e.g. "silvered" -> silver, red) are all found
+_COLOR_RE = re.compile("(?=(" + "|".join(FLY_COLORS) + "))")
+_CATCH_LIMIT_RE = re.compile(r"(\d+)\s*(fish|trout)")
+
+# Detail selectors of the form ".class-name" can be matched in a single DOM walk
+_SIMPLE_CLASS_SELECTOR_RE = re.compile(r"^\.([A-Za-z0-9_-]+)$")
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_url(raw: str) -> Optional[str]:
+    """
+    Validate a link href for use as a canonical URL (Article 4.4).
+
+    Accepts site-relative paths ("/river/x") and absolute http(s) URLs.
+    Protocol-relative links ("//host/x", or "/\\host/x" which browsers
+    read the same way) name another host, so they are not site paths.
+    Pure function, so repeated hrefs on a page are answered from the cache.
+
+    Returns:
+        Stripped URL, or None for empty, fragment-only or non-navigable links
+    """
+    url = raw.strip()
+    if not url or url.startswith("#"):
+        return None
+    if url.startswith("/"):
+        return url if url[1:2] not in ("/", "\\") else None
+
+    parsed = urlparse(url)
+    if parsed.scheme in ("http", "https") and parsed.netloc:
+        return url
+    return None
+
+
+# Link selectors of the form "[tag].class tag" (e.g. "div.region-list a", ".fishing-waters a")
+_CONTAINER_LINK_SELECTOR_RE = re.compile(
+    r"^([a-z][a-z0-9]*)?\.([A-Za-z0-9_-]+)\s+([a-z][a-z0-9]*)$"
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_link_selector(selector: str) -> Callable[[HtmlElement], Iterable[HtmlElement]]:
+    """
+    Build a link-selection function for a configured CSS selector.
+
+    The common "[tag].class tag" shape is specialized into a generator over
+    the tree, so links stream into the caller without CSS matching or an
+    intermediate list. Any other selector is translated to XPath and compiled
+    once. Cached by selector string, so a config edited after the parser was
+    built simply compiles the new selector on next use.
+
+    Returns:
+        Function mapping a parsed document to matching elements in document order
+    """
+    match = _CONTAINER_LINK_SELECTOR_RE.match(selector.strip())
+    if not match:
+        # Only elements are returned, so plain str results are never needed
+        return etree.XPath(HTMLTranslator().css_to_xpath(selector), smart_strings=False)
+
+    container_tag, class_name, link_tag = match.groups()
+
+    def select(tree: HtmlElement) -> Iterator[HtmlElement]:
+        seen = set()  # Nested containers would otherwise yield the same link twice
+        for container in tree.iter(container_tag or etree.Element):
+            if class_name not in (container.get("class") or "").split():
+                continue
+            for link in container.iterdescendants(link_tag):
+                if link not in seen:
+                    seen.add(link)
+                    yield link
+
+    return select
+
+
+def _strip_text(elem: HtmlElement) -> str:
+    """Concatenate an element's text fragments, each stripped of surrounding whitespace."""
+    return "".join(fragment.strip() for fragment in elem.itertext())
+
+
+@functools.lru_cache(maxsize=8192)
+def _slugify(text: str) -> str:
+    """
+    Normalize text to a lowercase, hyphen-separated slug.
+
+    Percent-escapes are decoded and accents decomposed (NFKD) first, so
+    "caf%C3%A9" and "Māori" keep their base letters ("cafe", "maori").
+    Runs of separators collapse to one hyphen with none at either end.
+    Text with no ASCII base letters at all ("河") falls back to its
+    lowercase percent-encoding ("%e6%b2%b3") so the slug is never empty.
+    """
+    decoded = unquote(text).casefold()
+    text = unicodedata.normalize("NFKD", decoded)
+    slug = text.encode("ascii", "ignore").decode("ascii").translate(_SLUG_TABLE)
+    slug = "-".join(filter(None, slug.split("-")))
+    return slug or quote(decoded.strip(), safe="").lower()
 
 
 class Parser:
@@ -23,7 +191,41 @@ class Parser:
         self.config = config
         self.discovery_rules = config.discovery_rules
 
-    def parse_region_index(self, html: str) -> List[Dict]:
+    @staticmethod
+    def parse_html(html: str) -> HtmlElement:
+        """
+        Parse HTML text into an lxml document (Article 5.3: tolerate malformed markup).
+
+        Args:
+            html: HTML content
+
+        Returns:
+            Root <html> element with <script>/<style> content removed (so
+            text_content() never picks it up); an empty document if the
+            input has no content
+        """
+        tree = None
+        if html and html.strip():
+            try:
+                tree = lxml.html.document_fromstring(html, parser=_HTML_PARSER)
+            except ValueError:
+                # Text carrying an XML encoding declaration must be parsed as bytes
+                tree = lxml.html.document_fromstring(html.encode("utf-8"), parser=_HTML_PARSER)
+            except etree.ParserError:
+                pass  # Nothing parseable (e.g. only comments)
+        if tree is None:
+            return lxml.html.document_fromstring("<html></html>", parser=_HTML_PARSER)
+        etree.strip_elements(tree, "script", "style", with_tail=False)
+        return tree
+
+    @classmethod
+    def _tree(cls, html: Union[str, HtmlElement]) -> HtmlElement:
+        """Parse HTML text, or pass through an already-parsed document unchanged."""
+        if isinstance(html, str):
+            return cls.parse_html(html)
+        return html
+
+    def parse_region_index(self, html: Union[str, HtmlElement]) -> ParseResult:
         """
         Parse region index page to discover regions (Article 4.1).
 
@@ -31,36 +233,35 @@ class Parser:
         Article 5.3: Accommodate predictable HTML structure.
 
         Args:
-            html: HTML content from "Where to Fish" index page
+            html: HTML content from "Where to Fish" index page, or a document
+                  already parsed with parse_html (only read, never modified)
 
         Returns:
-            List of region dicts with keys: name, canonical_url, slug, description
+            ParseResult of region dicts with keys: name, canonical_url, slug,
+            description (iterable/indexable; .names holds the region names)
         """
-        soup = BeautifulSoup(html, "lxml")
-        regions = []
-        seen_urls = set()  # De-duplicate by canonical URL
+        tree = self._tree(html)
+        # Keyed by canonical URL: de-duplicates while preserving page order
+        regions: Dict[str, Dict] = {}
 
-        # Get selector from config
-        selector = self.discovery_rules.get("region_selector", "div.region-list a")
-
-        # Find all region links
-        links = soup.select(selector)
+        # Find all region links (selector from config, compiled once per selector string)
+        select_links = _compile_link_selector(
+            self.discovery_rules.get("region_selector", "div.region-list a")
+        )
+        links = select_links(tree)
 
         for link in links:
-            # Extract canonical URL
-            canonical_url = link.get("href", "").strip()
-
-            # Skip invalid URLs (Article 4.4: graceful handling)
-            if not canonical_url or canonical_url in ["", "#"]:
+            # Extract canonical URL, skipping invalid ones (Article 4.4: graceful handling)
+            canonical_url = _normalize_url(link.get("href", ""))
+            if canonical_url is None:
                 continue
 
             # Skip duplicates
-            if canonical_url in seen_urls:
+            if canonical_url in regions:
                 continue
-            seen_urls.add(canonical_url)
 
             # Extract name (link text)
-            name = link.get_text().strip()
+            name = link.text_content().strip()
             if not name:
                 continue
 
@@ -70,25 +271,28 @@ class Parser:
                 # Extract slug from URL (e.g., /region/north-island -> north-island)
                 slug = canonical_url.rstrip("/").split("/")[-1]
 
+            # Ensure slug is lowercase and hyphenated
+            slug = _slugify(slug)
+
             # Extract description (if available in adjacent element)
             # Article 5.2: Only if explicitly present, no inference
             description = ""
-            desc_elem = link.find_next_sibling("p") or link.find_next_sibling("div")
-            if desc_elem:
-                description = desc_elem.get_text().strip()
-
-            regions.append(
-                {
-                    "name": name,
-                    "canonical_url": canonical_url,
-                    "slug": slug,
-                    "description": description,
-                }
-            )
-
-        return regions
-
-    def parse_region_page(self, html: str, region: Dict) -> List[Dict]:
+            desc_elem = next(link.itersiblings("p"), None)
+            if desc_elem is None:
+                desc_elem = next(link.itersiblings("div"), None)
+            if desc_elem is not None:
+                description = desc_elem.text_content().strip()
+
+            regions[canonical_url] = {
+                "name": name,
+                "canonical_url": canonical_url,
+                "slug": slug,
+                "description": description,
+            }
+
+        return ParseResult(tuple(regions.values()))
+
+    def parse_region_page(self, html: str, region: Dict) -> List[River]:
         """
         Parse region page to discover rivers (Article 4.2).
 
@@ -101,24 +305,39 @@ class Parser:
             region: Region dict with at least 'id' and 'name'
 
         Returns:
-            List of river dicts with keys: name, canonical_url, slug
+            List of River records (name, canonical_url, slug, region_id); they
+            also support dict-style access, e.g. river["name"]
+        """
+        return self.parse_region_tree(self.parse_html(html), region)
+
+    def parse_region_tree(self, tree: HtmlElement, region: Dict) -> List[River]:
+        """
+        Discover rivers in an already-parsed region page (see parse_region_page).
+
+        Lets callers holding a parsed document skip re-parsing; the tree is
+        only read, never modified.
+
+        Args:
+            tree: Region page parsed with parse_html
+            region: Region dict with at least 'id' and 'name'
+
+        Returns:
+            List of River records (name, canonical_url, slug, region_id); they
+            also support dict-style access, e.g. river["name"]
         """
-        soup = BeautifulSoup(html, "lxml")
         rivers = []
         seen_urls = set()  # De-duplicate by canonical URL
 
-        # Get selector from config
-        selector = self.discovery_rules.get("river_selector", "div.fishing-waters a")
-
-        # Find all river links
-        links = soup.select(selector)
+        # Find all river links (selector from config, compiled once per selector string)
+        select_links = _compile_link_selector(
+            self.discovery_rules.get("river_selector", "div.fishing-waters a")
+        )
+        links = select_links(tree)
 
         for link in links:
-            # Extract canonical URL
-            canonical_url = link.get("href", "").strip()
-
-            # Skip invalid URLs (Article 4.4: graceful handling)
-            if not canonical_url or canonical_url in ["", "#"]:
+            # Extract canonical URL, skipping invalid ones (Article 4.4: graceful handling)
+            canonical_url = _normalize_url(link.get("href", ""))
+            if canonical_url is None:
                 continue
 
             # Skip duplicates
@@ -127,7 +346,7 @@ class Parser:
             seen_urls.add(canonical_url)
 
             # Extract name (link text)
-            name = link.get_text().strip()
+            name = link.text_content().strip()
             if not name:
                 continue
 
@@ -138,9 +357,11 @@ class Parser:
                 slug = canonical_url.rstrip("/").split("/")[-1]
 
             # Ensure slug is lowercase and hyphenated
-            slug = slug.lower().replace("_", "-")
+            slug = _slugify(slug)
 
-            rivers.append({"name": name, "canonical_url": canonical_url, "slug": slug})
+            rivers.append(
+                River(name=name, slug=slug, canonical_url=canonical_url, region_id=region["id"])
+            )
 
         return rivers
 
@@ -159,112 +380,99 @@ class Parser:
         Returns:
             Dict with keys: fish_type, conditions, flies (list), regulations (list)
         """
-        soup = BeautifulSoup(html, "lxml")
+        tree = self.parse_html(html)
 
         # Get selectors from config
         detail_selectors = self.discovery_rules.get("detail_selectors", {})
-        fish_type_selector = detail_selectors.get("fish_type", ".fish-type")
-        situation_selector = detail_selectors.get("situation", ".situation")
-        flies_selector = detail_selectors.get("recommended_lures", ".recommended-lures")
-        regulations_selector = detail_selectors.get("regulations", ".regulations")
+        sections = self._select_detail_sections(
+            tree,
+            {
+                "fish_type": detail_selectors.get("fish_type", ".fish-type"),
+                "situation": detail_selectors.get("situation", ".situation"),
+                "flies": detail_selectors.get("recommended_lures", ".recommended-lures"),
+                "regulations": detail_selectors.get("regulations", ".regulations"),
+            },
+        )
 
         # Extract fish type
         fish_type = {}
-        fish_type_elem = soup.select_one(fish_type_selector)
-        if fish_type_elem:
-            fish_type["raw_text"] = fish_type_elem.get_text(strip=True)
+        fish_type_elem = sections["fish_type"]
+        if fish_type_elem is not None:
+            fish_type["raw_text"] = _strip_text(fish_type_elem)
 
         # Extract conditions (situation)
         conditions = {}
-        situation_elem = soup.select_one(situation_selector)
-        if situation_elem:
-            raw_text = situation_elem.get_text(strip=True)
+        situation_elem = sections["situation"]
+        if situation_elem is not None:
+            raw_text = _strip_text(situation_elem)
             conditions["raw_text"] = raw_text
 
             # Optionally normalize flow level if explicitly mentioned
             raw_lower = raw_text.lower()
             if "low flow" in raw_lower:
-                conditions["flow_level"] = "low"
+                conditions["flow_level"] = FLOW_LOW
             elif "medium flow" in raw_lower:
-                conditions["flow_level"] = "medium"
+                conditions["flow_level"] = FLOW_MEDIUM
             elif "high flow" in raw_lower:
-                conditions["flow_level"] = "high"
+                conditions["flow_level"] = FLOW_HIGH
 
         # Extract flies
         flies = []
-        flies_elem = soup.select_one(flies_selector)
-        if flies_elem:
+        flies_elem = sections["flies"]
+        if flies_elem is not None:
             # Find all list items or direct children
-            fly_items = flies_elem.select("li")
+            fly_items = list(flies_elem.iterdescendants("li"))
             if not fly_items:
                 # Try getting all text if no list structure
                 fly_items = [flies_elem]
 
-            for item in fly_items:
-                fly_text = item.get_text(strip=True)
-                if not fly_text:
-                    continue
-
-                # Classify fly (returns None for uncertain fields)
-                classification = self.classify_fly(fly_text, fly_text)
+            fly_texts = [text for text in map(_strip_text, fly_items) if text]
 
+            # Classify all flies at once (returns None for uncertain fields)
+            for fly_text, classification in zip(fly_texts, self.classify_flies(fly_texts)):
                 flies.append(
                     {
                         "name": fly_text,
                         "raw_text": fly_text,
-                        "category": classification.get("category"),
-                        "size": classification.get("size"),
-                        "color": classification.get("color"),
+                        "category": classification["category"],
+                        "size": classification["size"],
+                        "color": classification["color"],
                     }
                 )
 
         # Extract regulations
         regulations = []
-        regs_elem = soup.select_one(regulations_selector)
-        if regs_elem:
+        regs_elem = sections["regulations"]
+        if regs_elem is not None:
             # Find all paragraphs or list items
-            reg_items = regs_elem.select("p, li")
-            if not reg_items:
+            reg_texts = [_strip_text(item) for item in regs_elem.iterdescendants("p", "li")]
+            if not reg_texts:
                 # Try getting all text lines
-                text = regs_elem.get_text()
-                reg_items = [line for line in text.split("\n") if line.strip()]
-                # Create mock elements for processing
-                reg_items = [
-                    type(
-                        "obj", (), {"get_text": lambda self=l: l, "strip": lambda self=l: l.strip()}
-                    )()
-                    for l in reg_items
-                    if l.strip()
-                ]
-
-            for item in reg_items:
-                reg_text = (
-                    item.get_text(strip=True) if hasattr(item, "get_text") else str(item).strip()
-                )
+                reg_texts = [line.strip() for line in regs_elem.text_content().split("\n")]
+
+            for reg_text in reg_texts:
                 if not reg_text:
                     continue
 
                 # Classify regulation type
                 reg_lower = reg_text.lower()
-                reg_type = "unclassified"
+                reg_type = REG_UNCLASSIFIED
                 value = reg_text
 
                 if "catch limit" in reg_lower or "bag limit" in reg_lower:
-                    reg_type = "catch_limit"
+                    reg_type = REG_CATCH
                     # Extract number if present
-                    import re
-
-                    match = re.search(r"(\d+)\s*(fish|trout)", reg_lower)
+                    match = _CATCH_LIMIT_RE.search(reg_lower)
                     if match:
                         value = match.group(1) + " fish"
                 elif "season" in reg_lower:
-                    reg_type = "season_dates"
+                    reg_type = REG_SEASON
                 elif "method" in reg_lower or "fly only" in reg_lower or "artificial" in reg_lower:
-                    reg_type = "method"
+                    reg_type = REG_METHOD
                 elif "permit" in reg_lower or "license" in reg_lower:
-                    reg_type = "permit_required"
+                    reg_type = REG_PERMIT
                 elif "flow" in reg_lower and "status" in reg_lower:
-                    reg_type = "flow_status"
+                    reg_type = REG_FLOW
 
                 regulations.append({"type": reg_type, "value": value, "raw_text": reg_text})
 
@@ -275,6 +483,44 @@ class Parser:
             "regulations": regulations,
         }
 
+    @staticmethod
+    def _select_detail_sections(
+        tree: HtmlElement, selectors: Dict[str, str]
+    ) -> Dict[str, Optional[HtmlElement]]:
+        """
+        Find the first element matching each detail selector.
+
+        When every selector is a plain class selector (the default config), all
+        sections are located in one document-order walk that stops as soon as
+        each has been found. Any other selector falls back to cssselect per key.
+
+        Args:
+            tree: Parsed river detail page
+            selectors: Mapping of section key to CSS selector
+
+        Returns:
+            Mapping of section key to first matching element (None if absent)
+        """
+        keys_by_class: Dict[str, List[str]] = {}
+        for key, selector in selectors.items():
+            match = _SIMPLE_CLASS_SELECTOR_RE.match(selector.strip())
+            if not match:
+                return {
+                    key: next(iter(tree.cssselect(sel)), None) for key, sel in selectors.items()
+                }
+            keys_by_class.setdefault(match.group(1), []).append(key)
+
+        found: Dict[str, Optional[HtmlElement]] = dict.fromkeys(selectors)
+        for elem in tree.iter(etree.Element):
+            for class_name in (elem.get("class") or "").split():
+                # pop() so only the first element in document order is kept
+                for key in keys_by_class.pop(class_name, ()):
+                    found[key] = elem
+            if not keys_by_class:
+                break
+
+        return found
+
     def extract_text(self, html: str, selector: str) -> Optional[str]:
         """
         Extract text content from HTML using CSS selector.
@@ -287,11 +533,11 @@ class Parser:
             Extracted text or None if not found
         """
         try:
-            soup = BeautifulSoup(html, "lxml")
-            element = soup.select_one(selector)
+            tree = self.parse_html(html)
+            element = next(iter(tree.cssselect(selector)), None)
 
-            if element:
-                return element.get_text(strip=True)
+            if element is not None:
+                return _strip_text(element)
 
             return None
         except Exception as e:
@@ -312,57 +558,39 @@ class Parser:
         Returns:
             Dict with keys: category, size, color (all optional, None if uncertain)
         """
-        import re
-
-        name_lower = name.lower()
-
-        # Classify category using keywords
-        category = None
-        if any(word in name_lower for word in ["nymph", "hare", "pheasant tail", "prince"]):
-            category = "nymph"
-        elif any(word in name_lower for word in ["dry", "wulff", "adams", "elk hair", "parachute"]):
-            category = "dry"
-        elif any(
-            word in name_lower for word in ["streamer", "bugger", "woolly", "muddler", "zonker"]
-        ):
-            category = "streamer"
-        elif any(word in name_lower for word in ["wet", "soft hackle"]):
-            category = "wet"
-
-        # Extract size (number after # or size indicator)
-        size = None
-        size_match = re.search(r"#(\d+)", name)
-        if size_match:
-            size = size_match.group(1)
-        else:
-            # Try "size 14" format
-            size_match = re.search(r"size\s+(\d+)", name_lower)
-            if size_match:
-                size = size_match.group(1)
-
-        # Extract color (common fly colors)
-        color = None
-        colors = [
-            "black",
-            "brown",
-            "olive",
-            "gray",
-            "grey",
-            "white",
-            "red",
-            "yellow",
-            "orange",
-            "green",
-            "blue",
-            "purple",
-            "pink",
-            "tan",
-            "gold",
-            "silver",
-        ]
-        for c in colors:
-            if c in name_lower:
-                color = c
-                break
+        return self.classify_flies([name])[0]
 
-        return {"category": category, "size": size, "color": color}
+    def classify_flies(self, names: List[str]) -> List[Dict]:
+        """
+        Classify a batch of fly names (see classify_fly).
+
+        Each keyword group, size form and the color vocabulary is a single
+        precompiled pattern, so every fly costs a handful of regex calls
+        rather than a Python loop per keyword.
+
+        Args:
+            names: Fly names as listed on the page
+
+        Returns:
+            List of dicts with keys: category, size, color, in input order
+        """
+        results = []
+        for name, name_lower in zip(names, [n.lower() for n in names]):
+            # Classify category using keywords (first matching group wins)
+            category = None
+            for cat, pattern in _CATEGORY_PATTERNS:
+                if pattern.search(name_lower):
+                    category = cat
+                    break
+
+            # Extract size (number after # or "size 14" format)
+            size_match = _SIZE_HASH_RE.search(name) or _SIZE_WORD_RE.search(name_lower)
+            size = size_match.group(1) if size_match else None
+
+            # Extract color (vocabulary order decides between several mentions)
+            present = _COLOR_RE.findall(name_lower)
+            color = next((c for c in FLY_COLORS if c in present), None) if present else None
+
+            results.append({"category": category, "size": size, "color": color})
+
+        return results
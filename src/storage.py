@@ -4,41 +4,207 @@ Article 6 Compliance: Raw data immutability, atomic operations, metadata trackin
 """
 
 import sqlite3
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional, Union
+
+import xxhash
 
 from .exceptions import StorageError
 from .logger import ScraperLogger
+from .models import Fly, Regulation, River
+
+# INSERT ... RETURNING (used by every upsert below) arrived in SQLite 3.35
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+
+def content_hash(raw: str) -> str:
+    """
+    Fingerprint raw page content for change detection (Article 6.2).
+
+    Only answers "did this page change since the last crawl", so a fast
+    non-cryptographic 128-bit hash (xxh3) is used rather than MD5/SHA.
+
+    Returns:
+        32-character hex digest, as stored in metadata.raw_content_hash
+    """
+    return xxhash.xxh3_128_hexdigest(raw.encode("utf-8"))
 
 
 class Storage:
     """SQLite storage for scraper data."""
 
-    def __init__(self, db_path: str, logger: ScraperLogger):
+    # Write statements are kept as constants so every call hands sqlite3 the
+    # identical SQL text and the connection's statement cache reuses the
+    # prepared statement. Named parameters bind straight from the row dicts.
+    _INSERT_REGION_SQL = """
+        INSERT INTO regions (
+            name, slug, canonical_url, source_url, raw_html,
+            description, crawl_timestamp, updated_at
+        ) VALUES (
+            :name, :slug, :canonical_url, :source_url, :raw_html,
+            :description, :crawl_timestamp, CURRENT_TIMESTAMP
+        )
+        ON CONFLICT(canonical_url) DO UPDATE SET
+            name = excluded.name,
+            slug = excluded.slug,
+            raw_html = excluded.raw_html,
+            description = excluded.description,
+            crawl_timestamp = excluded.crawl_timestamp,
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING id
+    """
+
+    _INSERT_RIVER_SQL = """
+        INSERT INTO rivers (
+            region_id, name, slug, canonical_url, source_url,
+            raw_html, description, crawl_timestamp, updated_at
+        ) VALUES (
+            :region_id, :name, :slug, :canonical_url, :source_url,
+            :raw_html, :description, :crawl_timestamp, CURRENT_TIMESTAMP
+        )
+        ON CONFLICT(canonical_url) DO UPDATE SET
+            name = excluded.name,
+            slug = excluded.slug,
+            raw_html = excluded.raw_html,
+            description = excluded.description,
+            crawl_timestamp = excluded.crawl_timestamp,
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING id
+    """
+
+    # Multi-row form of _INSERT_RIVER_SQL: {values} is one _RIVER_VALUES group
+    # per row, so a whole chunk runs as a single statement
+    _INSERT_RIVERS_SQL = """
+        INSERT INTO rivers (
+            region_id, name, slug, canonical_url, source_url,
+            raw_html, description, crawl_timestamp, updated_at
+        ) VALUES {values}
+        ON CONFLICT(canonical_url) DO UPDATE SET
+            name = excluded.name,
+            slug = excluded.slug,
+            raw_html = excluded.raw_html,
+            description = excluded.description,
+            crawl_timestamp = excluded.crawl_timestamp,
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING id, canonical_url
+    """
+    _RIVER_VALUES = "(?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
+
+    # 8 bound parameters per row keeps a full chunk far below SQLite's
+    # 32766 host-parameter limit
+    _BATCH_RIVER_ROWS = 500
+
+    _INSERT_SECTION_SQL = """
+        INSERT INTO sections (
+            river_id, name, slug, canonical_url, raw_html,
+            description, crawl_timestamp, updated_at
+        ) VALUES (
+            :river_id, :name, :slug, :canonical_url, :raw_html,
+            :description, :crawl_timestamp, CURRENT_TIMESTAMP
+        )
+        ON CONFLICT(river_id, slug) DO UPDATE SET
+            crawl_timestamp = excluded.crawl_timestamp,
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING id
+    """
+
+    # Plain inserts (no upsert), shared by the single-row and batch paths
+    _INSERT_FLY_SQL = """
+        INSERT INTO recommended_flies (
+            river_id, section_id, name, raw_text, category,
+            size, color, notes, crawl_timestamp, updated_at
+        ) VALUES (
+            :river_id, :section_id, :name, :raw_text, :category,
+            :size, :color, :notes, :crawl_timestamp, CURRENT_TIMESTAMP
+        )
+    """
+
+    _INSERT_REGULATION_SQL = """
+        INSERT INTO regulations (
+            river_id, section_id, type, value, raw_text,
+            source_section, crawl_timestamp, updated_at
+        ) VALUES (
+            :river_id, :section_id, :type, :value, :raw_text,
+            :source_section, :crawl_timestamp, CURRENT_TIMESTAMP
+        )
+    """
+
+    _INSERT_METADATA_SQL = """
+        INSERT INTO metadata (
+            session_id, entity_id, entity_type, raw_content_hash,
+            parsed_hash, page_version, crawl_timestamp
+        ) VALUES (
+            :session_id, :entity_id, :entity_type, :raw_content_hash,
+            :parsed_hash, :page_version, :crawl_timestamp
+        )
+        ON CONFLICT(session_id, entity_id, entity_type) DO UPDATE SET
+            raw_content_hash = excluded.raw_content_hash,
+            parsed_hash = excluded.parsed_hash,
+            crawl_timestamp = excluded.crawl_timestamp
+        RETURNING id
+    """
+
+    # Room for every distinct statement above plus the read queries
+    _CACHED_STATEMENTS = 256
+
+    def __init__(
+        self,
+        db_path: str,
+        logger: ScraperLogger,
+        template: Optional[sqlite3.Connection] = None,
+    ):
         """
         Initialize storage and connect to database.
 
         Args:
-            db_path: Path to SQLite database file
+            db_path: Path to SQLite database file, or ":memory:" for a private
+                     in-memory database (nothing touches disk)
             logger: Logger instance
+            template: Optional connection to a database that already has the
+                      schema; its contents are copied in with the backup API
+                      instead of re-running schema.sql
         """
         self.db_path = Path(db_path)
         self.logger = logger
         self.conn = None
+        self._tx_depth = 0
 
         # Create database directory if needed
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        if str(db_path) != ":memory:":
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Only databases that outlive this process (not in-memory or temp-dir
+        # test databases) are worth refreshing planner stats for on close()
+        temp_root = Path(tempfile.gettempdir()).resolve()
+        self._persistent = str(db_path) != ":memory:" and not (
+            self.db_path.resolve().is_relative_to(temp_root)
+        )
 
         # Connect and initialize
         self._connect()
-        self.initialize_schema()
+        if template is not None:
+            template.backup(self.conn)
+        else:
+            self.initialize_schema()
 
     def _connect(self):
         """Establish database connection with proper settings."""
-        self.conn = sqlite3.connect(self.db_path)
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise StorageError(
+                f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))}+ required, "
+                f"found {sqlite3.sqlite_version}"
+            )
+        self.conn = sqlite3.connect(self.db_path, cached_statements=self._CACHED_STATEMENTS)
         self.conn.row_factory = sqlite3.Row  # Enable dict-like access
         self.conn.execute("PRAGMA foreign_keys = ON")
         self.conn.execute("PRAGMA journal_mode = WAL")
+        # WAL only needs fsync at checkpoints; NORMAL keeps commits to an append
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+        self.conn.execute("PRAGMA mmap_size = 268435456")  # 256 MiB
+        self.conn.execute("PRAGMA cache_size = -64000")  # ~64 MB (negative = KiB)
 
     def initialize_schema(self):
         """Create database schema from schema.sql (idempotent)."""
@@ -57,71 +223,144 @@ class Storage:
         except sqlite3.Error as e:
             raise StorageError(f"Failed to initialize schema: {e}")
 
+    @property
+    def transaction_depth(self) -> int:
+        """
+        Number of transaction scopes Storage currently has open (0 = none).
+
+        Scopes come from transaction() and begin_transaction(); an implicit
+        transaction opened by a bare conn.execute() does not count.
+        """
+        if not self.conn.in_transaction:
+            # Ended behind Storage's back (e.g. a raw conn.commit())
+            self._tx_depth = 0
+        return self._tx_depth
+
     def begin_transaction(self):
-        """Begin a database transaction."""
-        self.conn.execute("BEGIN")
+        """
+        Begin a transaction, or a SAVEPOINT nested inside one Storage already opened.
+
+        An implicit transaction left open by a bare conn.execute() is
+        committed first rather than silently absorbed.
+        """
+        depth = self.transaction_depth
+        if depth:
+            self.conn.execute(f"SAVEPOINT storage_{depth}")
+        else:
+            if self.conn.in_transaction:
+                self.conn.commit()
+            self.conn.execute("BEGIN")
+        self._tx_depth = depth + 1
 
     def commit(self):
-        """Commit current transaction."""
-        self.conn.commit()
+        """Commit the innermost transaction scope (RELEASE when nested)."""
+        depth = self.transaction_depth
+        if depth > 1:
+            self.conn.execute(f"RELEASE storage_{depth - 1}")
+            self._tx_depth = depth - 1
+        else:
+            self.conn.commit()
+            self._tx_depth = 0
 
     def rollback(self):
-        """Rollback current transaction."""
-        self.conn.rollback()
+        """Roll back the innermost transaction scope (ROLLBACK TO when nested)."""
+        depth = self.transaction_depth
+        if depth > 1:
+            self.conn.execute(f"ROLLBACK TO storage_{depth - 1}")
+            self.conn.execute(f"RELEASE storage_{depth - 1}")
+            self._tx_depth = depth - 1
+        else:
+            self.conn.rollback()
+            self._tx_depth = 0
 
     def close(self):
-        """Close database connection."""
+        """Close database connection, refreshing planner stats for persistent databases."""
         if self.conn:
+            if self._persistent:
+                self.conn.execute("PRAGMA optimize")
             self.conn.close()
+            self.conn = None  # Makes a second close() a no-op
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run a block atomically.
+
+        Opens BEGIN ... COMMIT, or a SAVEPOINT when Storage already has a
+        transaction open, so blocks nest (e.g. a batch insert inside a
+        caller's transaction). Any exception rolls the block back and is re-raised.
+        """
+        self.begin_transaction()
+        try:
+            yield
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+
+    @contextmanager
+    def _write(self):
+        """
+        Scope a single write: commit on success, roll back on sqlite3.Error.
+
+        Inside a scope Storage opened (transaction(), begin_transaction() or
+        a batch insert), commit/rollback is left to that scope. Otherwise the
+        write commits, together with any implicit transaction a bare
+        conn.execute() left open.
+        """
+        owns_transaction = self.transaction_depth == 0
+        try:
+            yield
+        except sqlite3.Error:
+            if owns_transaction:
+                self.conn.rollback()
+            raise
+        if owns_transaction:
+            self.conn.commit()
 
     # Region operations
 
-    def insert_region(self, region: Dict = None, **kwargs) -> int:
+    def insert_region(self, region: Mapping = None, **kwargs) -> int:
         """
         Insert or update a region.
 
         Args:
-            region: Dict with keys: name, slug, canonical_url, source_url,
-                   raw_html, description, crawl_timestamp
+            region: Mapping (dict or read-only view) with keys: name, slug,
+                   canonical_url, source_url, raw_html, description, crawl_timestamp
             **kwargs: Alternative to passing dict (for backward compatibility)
 
         Returns:
             Region ID
+
+        Raises:
+            ValueError: If name or canonical_url is empty
         """
         if region is None:
             region = kwargs
 
+        # Article 6.3: required fields must be non-empty (plain checks, no model build)
+        if not region["name"]:
+            raise ValueError("Region name cannot be empty")
+        if not region["canonical_url"]:
+            raise ValueError("Region canonical_url cannot be empty")
+
         try:
-            cursor = self.conn.execute(
-                """
-                INSERT INTO regions (
-                    name, slug, canonical_url, source_url, raw_html,
-                    description, crawl_timestamp, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                ON CONFLICT(canonical_url) DO UPDATE SET
-                    name = excluded.name,
-                    slug = excluded.slug,
-                    raw_html = excluded.raw_html,
-                    description = excluded.description,
-                    crawl_timestamp = excluded.crawl_timestamp,
-                    updated_at = CURRENT_TIMESTAMP
-                RETURNING id
-                """,
-                (
-                    region["name"],
-                    region["slug"],
-                    region["canonical_url"],
-                    region.get("source_url"),
-                    region.get("raw_html"),
-                    region.get("description"),
-                    region["crawl_timestamp"],
-                ),
-            )
-            region_id = cursor.fetchone()[0]
-            self.conn.commit()
+            with self._write():
+                cursor = self.conn.execute(
+                    self._INSERT_REGION_SQL,
+                    {
+                        "name": region["name"],
+                        "slug": region["slug"],
+                        "canonical_url": region["canonical_url"],
+                        "source_url": region.get("source_url"),
+                        "raw_html": region.get("raw_html"),
+                        "description": region.get("description"),
+                        "crawl_timestamp": region["crawl_timestamp"],
+                    },
+                )
+                region_id = cursor.fetchone()[0]
             return region_id
         except sqlite3.Error as e:
-            self.conn.rollback()
             raise StorageError(f"Failed to insert region: {e}")
 
     def get_region(self, region_id: int) -> Optional[Dict]:
@@ -140,15 +379,32 @@ class Storage:
         cursor = self.conn.execute("SELECT * FROM regions WHERE crawl_timestamp IS NULL")
         return [dict(row) for row in cursor.fetchall()]
 
+    def delete_region(self, region_id: int) -> bool:
+        """
+        Delete a region; its rivers and their children go with it (ON DELETE CASCADE).
+
+        Args:
+            region_id: Region ID
+
+        Returns:
+            True if a region was deleted, False if none matched
+        """
+        try:
+            with self._write():
+                cursor = self.conn.execute("DELETE FROM regions WHERE id = ?", (region_id,))
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            raise StorageError(f"Failed to delete region: {e}")
+
     # River operations
 
-    def insert_river(self, river: Dict = None, **kwargs) -> int:
+    def insert_river(self, river: Union[Dict, River] = None, **kwargs) -> int:
         """
         Insert or update a river.
 
         Args:
-            river: Dict with keys: region_id, name, slug, canonical_url,
-                  source_url, raw_html, description, crawl_timestamp
+            river: Dict or River with keys: region_id, name, slug, canonical_url,
+                  and optionally source_url, raw_html, description, crawl_timestamp
             **kwargs: Alternative to passing dict (for backward compatibility)
 
         Returns:
@@ -158,39 +414,27 @@ class Storage:
             river = kwargs
 
         try:
-            cursor = self.conn.execute(
-                """
-                INSERT INTO rivers (
-                    region_id, name, slug, canonical_url, source_url,
-                    raw_html, description, crawl_timestamp, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                ON CONFLICT(canonical_url) DO UPDATE SET
-                    name = excluded.name,
-                    slug = excluded.slug,
-                    raw_html = excluded.raw_html,
-                    description = excluded.description,
-                    crawl_timestamp = excluded.crawl_timestamp,
-                    updated_at = CURRENT_TIMESTAMP
-                RETURNING id
-                """,
-                (
-                    river["region_id"],
-                    river["name"],
-                    river["slug"],
-                    river["canonical_url"],
-                    river.get("source_url"),
-                    river.get("raw_html"),
-                    river.get("description"),
-                    river["crawl_timestamp"],
-                ),
-            )
-            river_id = cursor.fetchone()[0]
-            self.conn.commit()
+            with self._write():
+                cursor = self.conn.execute(self._INSERT_RIVER_SQL, self._river_row(river))
+                river_id = cursor.fetchone()[0]
             return river_id
         except sqlite3.Error as e:
-            self.conn.rollback()
             raise StorageError(f"Failed to insert river: {e}")
 
+    @staticmethod
+    def _river_row(river: Union[Dict, River]) -> Dict:
+        """Bind parameters for _INSERT_RIVER_SQL (in _INSERT_RIVERS_SQL column order)."""
+        return {
+            "region_id": river["region_id"],
+            "name": river["name"],
+            "slug": river["slug"],
+            "canonical_url": river["canonical_url"],
+            "source_url": river.get("source_url"),
+            "raw_html": river.get("raw_html"),
+            "description": river.get("description"),
+            "crawl_timestamp": river.get("crawl_timestamp"),
+        }
+
     def get_river(self, river_id: int) -> Optional[Dict]:
         """Get river by ID."""
         cursor = self.conn.execute("SELECT * FROM rivers WHERE id = ?", (river_id,))
@@ -214,32 +458,22 @@ class Storage:
     def insert_section(self, section: Dict) -> int:
         """Insert or update a section."""
         try:
-            cursor = self.conn.execute(
-                """
-                INSERT INTO sections (
-                    river_id, name, slug, canonical_url, raw_html,
-                    description, crawl_timestamp, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                ON CONFLICT(river_id, slug) DO UPDATE SET
-                    crawl_timestamp = excluded.crawl_timestamp,
-                    updated_at = CURRENT_TIMESTAMP
-                RETURNING id
-                """,
-                (
-                    section["river_id"],
-                    section["name"],
-                    section["slug"],
-                    section.get("canonical_url"),
-                    section.get("raw_html"),
-                    section.get("description"),
-                    section["crawl_timestamp"],
-                ),
-            )
-            section_id = cursor.fetchone()[0]
-            self.conn.commit()
+            with self._write():
+                cursor = self.conn.execute(
+                    self._INSERT_SECTION_SQL,
+                    {
+                        "river_id": section["river_id"],
+                        "name": section["name"],
+                        "slug": section["slug"],
+                        "canonical_url": section.get("canonical_url"),
+                        "raw_html": section.get("raw_html"),
+                        "description": section.get("description"),
+                        "crawl_timestamp": section["crawl_timestamp"],
+                    },
+                )
+                section_id = cursor.fetchone()[0]
             return section_id
         except sqlite3.Error as e:
-            self.conn.rollback()
             raise StorageError(f"Failed to insert section: {e}")
 
     def get_sections_by_river(self, river_id: int) -> List[Dict]:
@@ -251,39 +485,33 @@ class Storage:
 
     # Fly operations
 
-    def insert_fly(self, fly: Dict = None, **kwargs) -> int:
-        """Insert a recommended fly."""
+    def insert_fly(self, fly: Union[Dict, Fly] = None, **kwargs) -> int:
+        """Insert a recommended fly (dict or Fly record)."""
         if fly is None:
             fly = kwargs
 
         try:
-            cursor = self.conn.execute(
-                """
-                INSERT INTO recommended_flies (
-                    river_id, section_id, name, raw_text, category,
-                    size, color, notes, crawl_timestamp, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                RETURNING id
-                """,
-                (
-                    fly["river_id"],
-                    fly.get("section_id"),
-                    fly["name"],
-                    fly["raw_text"],
-                    fly.get("category"),
-                    fly.get("size"),
-                    fly.get("color"),
-                    fly.get("notes"),
-                    fly["crawl_timestamp"],
-                ),
-            )
-            fly_id = cursor.fetchone()[0]
-            self.conn.commit()
-            return fly_id
+            with self._write():
+                cursor = self.conn.execute(self._INSERT_FLY_SQL, self._fly_row(fly))
+            return cursor.lastrowid
         except sqlite3.Error as e:
-            self.conn.rollback()
             raise StorageError(f"Failed to insert fly: {e}")
 
+    @staticmethod
+    def _fly_row(fly: Union[Dict, Fly]) -> Dict:
+        """Bind parameters for _INSERT_FLY_SQL."""
+        return {
+            "river_id": fly["river_id"],
+            "section_id": fly.get("section_id"),
+            "name": fly["name"],
+            "raw_text": fly["raw_text"],
+            "category": fly.get("category"),
+            "size": fly.get("size"),
+            "color": fly.get("color"),
+            "notes": fly.get("notes"),
+            "crawl_timestamp": fly["crawl_timestamp"],
+        }
+
     def get_flies_by_river(self, river_id: int) -> List[Dict]:
         """Get all flies for a river."""
         cursor = self.conn.execute(
@@ -293,37 +521,33 @@ class Storage:
 
     # Regulation operations
 
-    def insert_regulation(self, regulation: Dict = None, **kwargs) -> int:
-        """Insert a regulation."""
+    def insert_regulation(self, regulation: Union[Dict, Regulation] = None, **kwargs) -> int:
+        """Insert a regulation (dict or Regulation record)."""
         if regulation is None:
             regulation = kwargs
 
         try:
-            cursor = self.conn.execute(
-                """
-                INSERT INTO regulations (
-                    river_id, section_id, type, value, raw_text,
-                    source_section, crawl_timestamp, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                RETURNING id
-                """,
-                (
-                    regulation["river_id"],
-                    regulation.get("section_id"),
-                    regulation["type"],
-                    regulation["value"],
-                    regulation["raw_text"],
-                    regulation.get("source_section"),
-                    regulation["crawl_timestamp"],
-                ),
-            )
-            reg_id = cursor.fetchone()[0]
-            self.conn.commit()
-            return reg_id
+            with self._write():
+                cursor = self.conn.execute(
+                    self._INSERT_REGULATION_SQL, self._regulation_row(regulation)
+                )
+            return cursor.lastrowid
         except sqlite3.Error as e:
-            self.conn.rollback()
             raise StorageError(f"Failed to insert regulation: {e}")
 
+    @staticmethod
+    def _regulation_row(regulation: Union[Dict, Regulation]) -> Dict:
+        """Bind parameters for _INSERT_REGULATION_SQL."""
+        return {
+            "river_id": regulation["river_id"],
+            "section_id": regulation.get("section_id"),
+            "type": regulation["type"],
+            "value": regulation["value"],
+            "raw_text": regulation["raw_text"],
+            "source_section": regulation.get("source_section"),
+            "crawl_timestamp": regulation["crawl_timestamp"],
+        }
+
     def get_regulations_by_river(self, river_id: int) -> List[Dict]:
         """Get all regulations for a river."""
         cursor = self.conn.execute(
@@ -339,33 +563,22 @@ class Storage:
             metadata = kwargs
 
         try:
-            cursor = self.conn.execute(
-                """
-                INSERT INTO metadata (
-                    session_id, entity_id, entity_type, raw_content_hash,
-                    parsed_hash, page_version, crawl_timestamp
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(session_id, entity_id, entity_type) DO UPDATE SET
-                    raw_content_hash = excluded.raw_content_hash,
-                    parsed_hash = excluded.parsed_hash,
-                    crawl_timestamp = excluded.crawl_timestamp
-                RETURNING id
-                """,
-                (
-                    metadata["session_id"],
-                    metadata.get("entity_id"),
-                    metadata["entity_type"],
-                    metadata.get("raw_content_hash"),
-                    metadata.get("parsed_hash"),
-                    metadata.get("page_version"),
-                    metadata["crawl_timestamp"],
-                ),
-            )
-            meta_id = cursor.fetchone()[0]
-            self.conn.commit()
+            with self._write():
+                cursor = self.conn.execute(
+                    self._INSERT_METADATA_SQL,
+                    {
+                        "session_id": metadata["session_id"],
+                        "entity_id": metadata.get("entity_id"),
+                        "entity_type": metadata["entity_type"],
+                        "raw_content_hash": metadata.get("raw_content_hash"),
+                        "parsed_hash": metadata.get("parsed_hash"),
+                        "page_version": metadata.get("page_version"),
+                        "crawl_timestamp": metadata["crawl_timestamp"],
+                    },
+                )
+                meta_id = cursor.fetchone()[0]
             return meta_id
         except sqlite3.Error as e:
-            self.conn.rollback()
             raise StorageError(f"Failed to insert metadata: {e}")
 
     def get_latest_crawl_for_entity(self, entity_type: str, entity_id: int) -> Optional[Dict]:
@@ -389,30 +602,80 @@ class Storage:
 
     def batch_insert_regions(self, regions: List[Dict]) -> List[int]:
         """Insert multiple regions in a transaction."""
-        region_ids = []
         try:
-            self.begin_transaction()
-            for region in regions:
-                region_id = self.insert_region(region)
-                region_ids.append(region_id)
-            self.commit()
-            return region_ids
+            with self.transaction():
+                return [self.insert_region(region) for region in regions]
         except Exception as e:
-            self.rollback()
             raise StorageError(f"Batch insert failed: {e}")
 
-    def batch_insert_rivers(self, rivers: List[Dict]) -> List[int]:
-        """Insert multiple rivers in a transaction."""
-        river_ids = []
+    def batch_insert_rivers(self, rivers: List[Union[Dict, River]]) -> List[int]:
+        """
+        Insert or update multiple rivers in a transaction.
+
+        Rows go in as multi-row upserts of up to _BATCH_RIVER_ROWS rows each.
+        RETURNING order is not guaranteed for multi-row statements, so ids
+        are matched back to rows by canonical_url.
+
+        Returns:
+            River IDs in input order
+        """
+        rows = [self._river_row(river) for river in rivers]
+        ids_by_url = {}
         try:
-            self.begin_transaction()
-            for river in rivers:
-                river_id = self.insert_river(river)
-                river_ids.append(river_id)
-            self.commit()
-            return river_ids
+            with self.transaction():
+                for start in range(0, len(rows), self._BATCH_RIVER_ROWS):
+                    chunk = rows[start : start + self._BATCH_RIVER_ROWS]
+                    sql = self._INSERT_RIVERS_SQL.format(
+                        values=", ".join([self._RIVER_VALUES] * len(chunk))
+                    )
+                    params = [value for row in chunk for value in row.values()]
+                    ids_by_url.update(
+                        (url, river_id) for river_id, url in self.conn.execute(sql, params)
+                    )
         except Exception as e:
-            self.rollback()
+            raise StorageError(f"Batch insert failed: {e}")
+        return [ids_by_url[row["canonical_url"]] for row in rows]
+
+    def batch_insert_flies(self, flies: List[Union[Dict, Fly]]) -> List[int]:
+        """Insert multiple flies with one executemany in a single transaction."""
+        return self._batch_insert(
+            "recommended_flies", self._INSERT_FLY_SQL, [self._fly_row(fly) for fly in flies]
+        )
+
+    def batch_insert_regulations(self, regulations: List[Union[Dict, Regulation]]) -> List[int]:
+        """Insert multiple regulations with one executemany in a single transaction."""
+        return self._batch_insert(
+            "regulations",
+            self._INSERT_REGULATION_SQL,
+            [self._regulation_row(reg) for reg in regulations],
+        )
+
+    def _batch_insert(self, table: str, sql: str, rows: List[Dict]) -> List[int]:
+        """
+        Run a plain INSERT for every row and return the new ids in row order.
+
+        AUTOINCREMENT ids within one write are consecutive, so they are
+        recovered from last_insert_rowid() instead of one RETURNING per row.
+        The range is checked against the table before the batch commits; if
+        it does not hold exactly the inserted rows the batch is rolled back.
+        """
+        if not rows:
+            return []
+        try:
+            with self.transaction():
+                self.conn.executemany(sql, rows)
+                last_id = self.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                first_id = last_id - len(rows) + 1
+                count = self.conn.execute(
+                    f"SELECT COUNT(*) FROM {table} WHERE id BETWEEN ? AND ?", (first_id, last_id)
+                ).fetchone()[0]
+                if count != len(rows):
+                    raise StorageError(
+                        f"Batch insert into {table} got non-consecutive ids: "
+                        f"{count} rows in {first_id}..{last_id}, expected {len(rows)}"
+                    )
+            return list(range(first_id, last_id + 1))
+        except sqlite3.Error as e:
             raise StorageError(f"Batch insert failed: {e}")
 
     # Utility queries
@@ -8,11 +8,13 @@ import sqlite3
 import threading
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
+from types import MappingProxyType
 
 from src.config import Config
 from src.logger import ScraperLogger
 from src.storage import Storage
 from src.fetcher import Fetcher
+from src.parser import Parser
 
 
 @pytest.fixture
@@ -22,10 +24,9 @@ def temp_dir():
         yield Path(tmpdir)
 
 
-@pytest.fixture
-def test_config(temp_dir):
+def write_test_config(temp_dir: Path) -> Config:
     """
-    Create test configuration with temporary paths.
+    Write the standard test configuration under temp_dir and load it.
 
     Returns:
         Config instance with temp database, logs, cache
@@ -66,6 +67,31 @@ pdf_config:
     return Config(str(config_path))
 
 
+@pytest.fixture
+def test_config(temp_dir):
+    """
+    Create test configuration with temporary paths.
+
+    Returns:
+        Config instance with temp database, logs, cache
+    """
+    return write_test_config(temp_dir)
+
+
+@pytest.fixture(scope="module")
+def parser(tmp_path_factory):
+    """
+    Parser built once per module from the standard test configuration.
+
+    Shared between tests, so tests that edit discovery_rules must build
+    their own Parser from test_config instead.
+
+    Returns:
+        Parser instance
+    """
+    return Parser(write_test_config(tmp_path_factory.mktemp("parser")))
+
+
 @pytest.fixture
 def test_logger(temp_dir):
     """
@@ -75,21 +101,71 @@ def test_logger(temp_dir):
         ScraperLogger instance writing to temp log file
     """
     log_path = temp_dir / "test.log"
-    return ScraperLogger(str(log_path))
+    logger = ScraperLogger(str(log_path))
+    yield logger
+    logger.close()
+
+
+@pytest.fixture(scope="session")
+def schema_template(tmp_path_factory):
+    """
+    Empty in-memory database with the schema applied once per session.
+
+    Cloned into each test_storage via the backup API; never written to.
+
+    Returns:
+        sqlite3 connection holding the template database
+    """
+    logger = ScraperLogger(str(tmp_path_factory.mktemp("schema") / "schema.log"))
+    storage = Storage(":memory:", logger)
+    yield storage.conn
+    storage.close()
+    logger.close()
+
+
+@pytest.fixture(scope="session")
+def session_storage(tmp_path_factory, schema_template):
+    """
+    One in-memory Storage shared by every test_storage in the session.
+
+    Returns:
+        Storage instance (emptied after each test by test_storage)
+    """
+    logger = ScraperLogger(str(tmp_path_factory.mktemp("storage") / "storage.log"))
+    storage = Storage(":memory:", logger, template=schema_template)
+    yield storage
+    storage.close()
+    logger.close()
 
 
 @pytest.fixture
-def test_storage(test_config, test_logger):
+def test_storage(session_storage, test_logger, schema_template):
     """
     Create test storage with initialized schema.
 
+    The session's in-memory database is reused: each test runs inside a
+    Storage transaction scope (nested as a SAVEPOINT under any outer scope)
+    that is rolled back afterwards, so no connection, schema or file setup
+    happens per test. Storage writes join the open scope rather than
+    committing. A test that commits or rolls back past the scope gets the
+    empty schema restored from schema_template instead.
+
     Returns:
         Storage instance with empty database
     """
-    storage = Storage(test_config.database_path, test_logger)
-    storage.initialize_schema()
+    storage = session_storage
+    storage.logger = test_logger
+    outer_depth = storage.transaction_depth
+    storage.begin_transaction()
     yield storage
-    storage.close()
+    if storage.transaction_depth > outer_depth:
+        while storage.transaction_depth > outer_depth:
+            storage.rollback()
+    else:  # Scope already ended by the test; what it committed must go
+        while storage.transaction_depth:
+            storage.rollback()
+        storage.conn.rollback()
+        schema_template.backup(storage.conn)
 
 
 @pytest.fixture
@@ -105,18 +181,24 @@ def test_fetcher(test_config, test_logger):
     fetcher.close()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_region_data():
-    """Sample region data for testing."""
-    return {
-        "name": "Test Region",
-        "slug": "test-region",
-        "canonical_url": "http://example.com/region/test-region",
-        "source_url": "http://example.com/regions",
-        "raw_html": "<html><body>Test Region Page</body></html>",
-        "description": "A test region for unit tests",
-        "crawl_timestamp": "2024-01-15T12:00:00Z",
-    }
+    """
+    Sample region data for testing.
+
+    Built once per session and read-only; take a .copy() to vary it.
+    """
+    return MappingProxyType(
+        {
+            "name": "Test Region",
+            "slug": "test-region",
+            "canonical_url": "http://example.com/region/test-region",
+            "source_url": "http://example.com/regions",
+            "raw_html": "<html><body>Test Region Page</body></html>",
+            "description": "A test region for unit tests",
+            "crawl_timestamp": "2024-01-15T12:00:00Z",
+        }
+    )
 
 
 @pytest.fixture
@@ -85,6 +85,7 @@ def test_fetcher_logs_delay_duration(test_config, test_logger, tmp_path):
         fetcher.fetch("http://httpbin.org/status/200", use_cache=False)
 
         # Read log file
+        test_logger.flush()
         log_path = test_config.log_path
         with open(log_path, "r") as f:
             log_lines = f.readlines()
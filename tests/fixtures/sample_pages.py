@@ -3,6 +3,10 @@ Static HTML sample pages for offline unit tests.
 Article 5 Compliance: Minimal, complete, unambiguous test data.
 """
 
+import functools
+
+from src.parser import Parser
+
 # Minimal valid index page
 MINIMAL_INDEX = """
 <!DOCTYPE html>
@@ -303,3 +307,14 @@ EMPTY_HTML = """
 </body>
 </html>
 """
+
+
+@functools.cache
+def parsed(name: str):
+    """
+    Return (raw_html, parsed_document) for the named fixture, parsed once per session.
+
+    The parsed document is shared between tests and must be treated as read-only.
+    """
+    raw_html = globals()[name]
+    return raw_html, Parser.parse_html(raw_html)
@@ -0,0 +1,33 @@
+"""
+Plain helper functions shared by the test modules.
+Imported directly (unlike conftest.py, which pytest loads itself).
+"""
+
+import json
+from pathlib import Path
+
+RIVER_TEMPLATE = {
+    "name": "Test River",
+    "slug": "test-river",
+    "canonical_url": "http://example.com/river/test",
+}
+
+
+def make_river(region_id: int, **overrides) -> dict:
+    """
+    Build a river payload for region_id from RIVER_TEMPLATE.
+
+    Returns:
+        New dict; keyword overrides replace template fields
+    """
+    return {"region_id": region_id, **RIVER_TEMPLATE, **overrides}
+
+
+def read_log(path: Path) -> list:
+    """
+    Read a JSON-lines log file in one call.
+
+    Returns:
+        List of decoded log entries (blank lines skipped)
+    """
+    return [json.loads(line) for line in path.read_bytes().splitlines() if line]
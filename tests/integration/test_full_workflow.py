@@ -186,6 +186,7 @@ def test_full_scraper_workflow(test_config, test_logger, test_storage, mock_http
         pass  # Don't care about result, just want log entry
 
     # Check that log file exists and has proper format
+    test_logger.flush()
     if test_logger.log_path.exists():
         with open(test_logger.log_path, "r") as f:
             log_lines = f.readlines()
@@ -305,6 +306,7 @@ def test_rate_limiting_compliance(test_config, test_logger, mock_http_server, tm
         fetcher.fetch(url)
 
     # Verify delays in logs
+    test_logger.flush()
     with open(log_file, "r") as f:
         log_lines = [line for line in f.readlines() if "http_request" in line]
 
@@ -35,6 +35,7 @@ def test_rate_limiting_enforces_3_second_delay(
         fetcher.fetch(url)
 
     # Read log file and verify delays
+    test_logger.flush()
     import json
 
     with open(log_file, "r") as f:
@@ -77,6 +78,7 @@ def test_all_requests_logged(test_config, test_logger, mock_http_server, tmp_pat
         fetcher.fetch(url)
 
     # Read log file
+    test_logger.flush()
     assert log_file.exists(), "Log file not created"
 
     with open(log_file, "r") as f:
@@ -220,6 +222,7 @@ def test_request_delay_accumulation(test_config, test_logger, mock_http_server,
     fetcher.fetch(f"{mock_http_server}/page2")
 
     # Read log and verify second request had proper delay
+    test_logger.flush()
     import json
 
     with open(log_file, "r") as f:
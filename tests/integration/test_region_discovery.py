@@ -7,6 +7,7 @@ Success Criteria SC-001: All regions from index discoverable and stored
 import pytest
 from src.config import Config
 from src.logger import ScraperLogger
+from src.models import ParseResult
 from src.storage import Storage
 from src.fetcher import Fetcher
 from src.parser import Parser
@@ -62,7 +63,7 @@ def test_region_discovery_full_workflow(test_config, test_logger, test_storage):
 
         # Verify region names match
         stored_names = {r["name"] for r in stored_regions}
-        expected_names = {r["name"] for r in regions}
+        expected_names = regions.names
         assert (
             stored_names == expected_names
         ), f"Stored names {stored_names} != expected {expected_names}"
@@ -133,7 +134,7 @@ def test_region_discovery_empty_index(test_config, test_logger, test_storage):
     regions = parser.parse_region_index(html)
 
     # Should return empty list, not raise exception
-    assert regions == [], f"Expected empty list for no-match HTML, got {regions}"
+    assert len(regions) == 0, f"Expected no regions for no-match HTML, got {regions}"
 
     # Verify no regions inserted
     all_regions = test_storage.get_regions()
@@ -155,8 +156,8 @@ def test_region_discovery_malformed_html(test_config, test_logger, test_storage)
     # Parse malformed HTML (BeautifulSoup should handle gracefully)
     regions = parser.parse_region_index(html)
 
-    # May return partial results or empty list, should not crash
-    assert isinstance(regions, list), f"Expected list, got {type(regions)}"
+    # May return partial results or no results, should not crash
+    assert isinstance(regions, ParseResult), f"Expected ParseResult, got {type(regions)}"
 
 
 def test_region_discovery_with_logging(test_config, test_logger, test_storage):
@@ -186,6 +187,7 @@ def test_region_discovery_with_logging(test_config, test_logger, test_storage):
         test_logger.log_discovery(entity_type="region", entity_name=region["name"], action="INSERT")
 
     # Read log file
+    test_logger.flush()
     import json
 
     with open(test_config.log_path, "r") as f:
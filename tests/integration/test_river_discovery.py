@@ -299,12 +299,7 @@ def test_river_discovery_cascade_delete(test_config, test_logger, test_storage):
     assert test_storage.get_river(river_id_2) is not None
 
     # Delete region (should cascade to rivers)
-    import sqlite3
-
-    conn = sqlite3.connect(test_config.database_path)
-    conn.execute("DELETE FROM regions WHERE id = ?", (region_id,))
-    conn.commit()
-    conn.close()
+    assert test_storage.delete_region(region_id)
 
     # Verify rivers deleted
     assert test_storage.get_river(river_id_1) is None
@@ -354,6 +349,7 @@ def test_river_discovery_with_logging(test_config, test_logger, test_storage):
         test_logger.log_discovery(entity_type="river", entity_name=river["name"], action="INSERT")
 
     # Read log file
+    test_logger.flush()
     import json
 
     with open(test_config.log_path, "r") as f:
@@ -7,9 +7,14 @@ import pytest
 from src.parser import Parser
 
 
-def test_parser_no_default_values(test_config):
+@pytest.mark.parametrize(
+    "fly_text",
+    ["Mystery Pattern", "Simple Fly", "Mystery Fly"],
+    ids=["mystery-pattern", "simple-fly", "mystery-fly"],
+)
+def test_fly_no_inference(test_config, fly_text):
     """
-    Test that parser returns None for uncertain fields, not defaults.
+    Test that parser returns None for uncertain fly fields, not defaults.
 
     Article 5.2: No inference or fabrication.
     FR-010: Missing data must remain null, not defaulted.
@@ -18,13 +23,13 @@ def test_parser_no_default_values(test_config):
 
     river = {"id": 1, "name": "Test River"}
 
-    # Minimal HTML with ambiguous fly
-    html = """
+    # Minimal HTML with a single ambiguous fly (no category/size/color indicators)
+    html = f"""
     <html>
     <body>
         <div class="recommended-lures">
             <ul>
-                <li>Mystery Pattern</li>
+                <li>{fly_text}</li>
             </ul>
         </div>
     </body>
@@ -36,11 +41,10 @@ def test_parser_no_default_values(test_config):
     fly = details["flies"][0]
 
     # Name is explicit, should be present
-    assert fly["name"] == "Mystery Pattern"
-    assert fly["raw_text"] == "Mystery Pattern"
+    assert fly["name"] == fly_text
+    assert fly["raw_text"] == fly_text
 
     # Category/size/color uncertain - should be None, not 'unknown' or '0'
-    # If classify_fly can't determine, must return None
     if fly.get("category") is not None:
         # If not None, must be valid category
         assert fly["category"] in ["nymph", "dry", "streamer", "wet"]
@@ -97,43 +101,6 @@ def test_missing_sections_return_empty(test_config):
         assert details["fish_type"]["raw_text"] != "Unknown"
 
 
-def test_partial_fly_data_no_inference(test_config):
-    """
-    Test that partial fly data doesn't get inferred fields.
-    """
-    parser = Parser(test_config)
-
-    river = {"id": 1, "name": "Test River"}
-
-    # Fly with only name, no size/color indicators
-    html = """
-    <html>
-    <body>
-        <div class="recommended-lures">
-            <ul>
-                <li>Simple Fly</li>
-            </ul>
-        </div>
-    </body>
-    </html>
-    """
-
-    details = parser.parse_river_detail(html, river)
-
-    fly = details["flies"][0]
-
-    # Explicit field
-    assert fly["name"] == "Simple Fly"
-
-    # Uncertain fields - must not be inferred
-    # If can't extract size from "Simple Fly", must be None
-    if fly.get("size") is None:
-        assert True, "Correctly didn't infer size"
-
-    if fly.get("color") is None:
-        assert True, "Correctly didn't infer color"
-
-
 def test_regulation_type_no_inference(test_config):
     """
     Test that regulation types are not inferred from ambiguous text.
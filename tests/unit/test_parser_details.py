@@ -77,6 +77,32 @@ def test_parse_river_detail_minimal(test_config):
     assert details["regulations"] == []
 
 
+def test_parse_river_detail_ignores_script_and_style(test_config):
+    """
+    Test that inline <script>/<style> content never leaks into extracted text.
+    """
+    parser = Parser(test_config)
+
+    river = {"id": 1, "name": "Scripted River"}
+
+    html = """
+    <html>
+    <body>
+        <div class="fish-type">Brown<script>var x = 1;</script> Trout</div>
+        <div class="recommended-lures"><style>.a { color: red }</style>Royal Wulff</div>
+        <div class="regulations"><script>track()</script>Catch limit: 2</div>
+    </body>
+    </html>
+    """
+
+    details = parser.parse_river_detail(html, river)
+
+    assert details["fish_type"]["raw_text"] == "Brown Trout"
+    assert [fly["name"] for fly in details["flies"]] == ["Royal Wulff"]
+    assert [reg["raw_text"] for reg in details["regulations"]] == ["Catch limit: 2"]
+    assert parser.extract_text(html, "div.fish-type") == "Brown Trout"
+
+
 def test_parse_river_detail_empty(test_config):
     """
     Test parsing empty river detail page.
@@ -96,45 +122,40 @@ def test_parse_river_detail_empty(test_config):
     assert details["regulations"] == []
 
 
-def test_classify_fly_nymph(test_config):
+@pytest.mark.parametrize(
+    "name,category,size,color",
+    [
+        ("Pheasant Tail Nymph #16 Brown", "nymph", "16", "brown"),
+        ("Royal Wulff #14 Red", "dry", "14", "red"),
+        ("Woolly Bugger #10 Black", "streamer", "10", "black"),
+    ],
+    ids=["nymph", "dry", "streamer"],
+)
+def test_classify_fly_known_patterns(test_config, name, category, size, color):
     """
-    Test classify_fly() for nymph patterns.
+    Test classify_fly() for nymph, dry fly and streamer patterns.
     """
     parser = Parser(test_config)
 
-    result = parser.classify_fly(
-        name="Pheasant Tail Nymph #16 Brown", raw_text="Pheasant Tail Nymph #16 Brown"
-    )
+    result = parser.classify_fly(name=name, raw_text=name)
 
-    assert result["category"] == "nymph" or result["category"] is None
-    assert result["size"] == "16" or result["size"] is None
-    assert result["color"] == "brown" or result["color"] is None
+    assert result["category"] in [category, None]
+    assert result["size"] in [size, None]
+    assert result["color"] in [color, None]
 
 
-def test_classify_fly_dry(test_config):
+def test_classify_flies_matches_classify_fly(test_config):
     """
-    Test classify_fly() for dry fly patterns.
+    Test that batch classification agrees with per-fly classification.
     """
     parser = Parser(test_config)
 
-    result = parser.classify_fly(name="Royal Wulff #14 Red", raw_text="Royal Wulff #14 Red")
-
-    # Royal Wulff is a dry fly
-    assert result["category"] in ["dry", None]
-    assert result["size"] in ["14", None]
-
-
-def test_classify_fly_streamer(test_config):
-    """
-    Test classify_fly() for streamer patterns.
-    """
-    parser = Parser(test_config)
+    names = ["Pheasant Tail Nymph #16 Brown", "Royal Wulff #14 Red", "Mystery Fly"]
 
-    result = parser.classify_fly(name="Woolly Bugger #10 Black", raw_text="Woolly Bugger #10 Black")
+    results = parser.classify_flies(names)
 
-    assert result["category"] in ["streamer", None]
-    assert result["size"] in ["10", None]
-    assert result["color"] in ["black", None]
+    assert results == [parser.classify_fly(name, name) for name in names]
+    assert results[2] == {"category": None, "size": None, "color": None}
 
 
 def test_classify_fly_uncertain(test_config):
@@ -238,11 +259,9 @@ def test_parse_regulations_season(test_config):
     assert "October" in reg["value"]
 
 
-def test_parse_river_detail_no_inference_flies(test_config):
+def test_parse_flow_conditions(test_config):
     """
-    Test that fly parsing doesn't infer missing information.
-
-    Article 5.2: No inference.
+    Test parsing flow conditions from situation text.
     """
     parser = Parser(test_config)
 
@@ -251,30 +270,26 @@ def test_parse_river_detail_no_inference_flies(test_config):
     html = """
     <html>
     <body>
-        <div class="recommended-lures">
-            <ul>
-                <li>Mystery Fly</li>
-            </ul>
-        </div>
+        <div class="situation">Clear water, high flow</div>
     </body>
     </html>
     """
 
     details = parser.parse_river_detail(html, river)
 
-    fly = details["flies"][0]
-    assert fly["name"] == "Mystery Fly"
+    assert "high flow" in details["conditions"]["raw_text"].lower()
 
-    # If category/size/color can't be determined, should be None
-    # Not default values like 'unknown' or '0'
-    if fly.get("category") is not None:
-        assert fly["category"] in ["nymph", "dry", "streamer"]
+    # Optionally normalized to 'high'
+    if "flow_level" in details["conditions"]:
+        assert details["conditions"]["flow_level"] in ["low", "medium", "high", None]
 
 
-def test_parse_flow_conditions(test_config):
+def test_parse_river_detail_with_custom_selector(test_config):
     """
-    Test parsing flow conditions from situation text.
+    Test that non-class detail selectors from config are still honoured.
     """
+    test_config.data["discovery_rules"]["detail_selectors"]["fish_type"] = "div#species"
+
     parser = Parser(test_config)
 
     river = {"id": 1, "name": "Test River"}
@@ -282,15 +297,14 @@ def test_parse_flow_conditions(test_config):
     html = """
     <html>
     <body>
-        <div class="situation">Clear water, high flow</div>
+        <div class="fish-type">Ignored</div>
+        <div id="species">Rainbow Trout</div>
+        <div class="situation">Clear water, low flow</div>
     </body>
     </html>
     """
 
     details = parser.parse_river_detail(html, river)
 
-    assert "high flow" in details["conditions"]["raw_text"].lower()
-
-    # Optionally normalized to 'high'
-    if "flow_level" in details["conditions"]:
-        assert details["conditions"]["flow_level"] in ["low", "medium", "high", None]
+    assert details["fish_type"]["raw_text"] == "Rainbow Trout"
+    assert details["conditions"]["flow_level"] == "low"
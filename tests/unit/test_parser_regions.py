@@ -7,11 +7,10 @@ import pytest
 from src.parser import Parser
 from tests.fixtures.sample_pages import (
     MINIMAL_INDEX,
-    MULTIPLE_REGIONS,
-    DUPLICATE_LINKS,
     INVALID_URLS,
     NO_MATCHES,
     EMPTY_HTML,
+    parsed,
 )
 
 
@@ -35,13 +34,13 @@ def test_parse_region_index_multiple(test_config):
     Test parsing index with multiple regions.
     """
     parser = Parser(test_config)
-    regions = parser.parse_region_index(MULTIPLE_REGIONS)
+    _, tree = parsed("MULTIPLE_REGIONS")
+    regions = parser.parse_region_index(tree)
 
     assert len(regions) == 3, f"Expected 3 regions, got {len(regions)}"
 
     # Verify all expected names present
-    names = {r["name"] for r in regions}
-    assert names == {"North Island", "South Island", "Stewart Island"}
+    assert regions.names == {"North Island", "South Island", "Stewart Island"}
 
     # Verify all have required fields
     for region in regions:
@@ -57,7 +56,8 @@ def test_parse_region_index_duplicate_links(test_config):
     Test that duplicate links are de-duplicated by canonical URL.
     """
     parser = Parser(test_config)
-    regions = parser.parse_region_index(DUPLICATE_LINKS)
+    _, tree = parsed("DUPLICATE_LINKS")
+    regions = parser.parse_region_index(tree)
 
     # DUPLICATE_LINKS has 2 links to /region/test, 1 to /region/other
     # Should de-duplicate to 2 unique regions
@@ -93,7 +93,7 @@ def test_parse_region_index_no_matches(test_config):
     regions = parser.parse_region_index(NO_MATCHES)
 
     # Should return empty list, not raise exception
-    assert regions == [], f"Expected empty list for no matches, got {regions}"
+    assert len(regions) == 0, f"Expected no regions for no matches, got {regions}"
 
 
 def test_parse_region_index_empty_html(test_config):
@@ -103,7 +103,7 @@ def test_parse_region_index_empty_html(test_config):
     parser = Parser(test_config)
     regions = parser.parse_region_index(EMPTY_HTML)
 
-    assert regions == [], f"Expected empty list for empty HTML, got {regions}"
+    assert len(regions) == 0, f"Expected no regions for empty HTML, got {regions}"
 
 
 def test_parse_region_index_slug_generation(test_config):
@@ -111,7 +111,8 @@ def test_parse_region_index_slug_generation(test_config):
     Test that slugs are properly generated from names or URLs.
     """
     parser = Parser(test_config)
-    regions = parser.parse_region_index(MULTIPLE_REGIONS)
+    _, tree = parsed("MULTIPLE_REGIONS")
+    regions = parser.parse_region_index(tree)
 
     # Verify slugs are lowercase, hyphenated
     for region in regions:
@@ -175,8 +176,7 @@ def test_parse_region_index_special_characters(test_config):
     regions = parser.parse_region_index(html)
 
     # Should preserve special characters
-    names = {r["name"] for r in regions}
-    assert "Rotorua (Te Arawa)" in names, "Special characters not preserved"
+    assert "Rotorua (Te Arawa)" in regions.names, "Special characters not preserved"
 
 
 def test_parse_region_index_raw_html_preservation(test_config):
@@ -202,7 +202,7 @@ def test_parse_region_index_with_custom_selector(test_config):
     Test that parser respects custom selector from config.
     """
     # Modify config selector
-    test_config._config["discovery_rules"]["region_selector"] = "ul.custom-list a"
+    test_config.data["discovery_rules"]["region_selector"] = "ul.custom-list a"
 
     parser = Parser(test_config)
 
@@ -218,3 +218,44 @@ def test_parse_region_index_with_custom_selector(test_config):
 
     assert len(regions) == 1
     assert regions[0]["name"] == "Custom Region"
+
+
+def test_parse_region_index_selector_changed_after_init(test_config):
+    """
+    Test that a region selector edited after the parser is created still applies.
+    """
+    parser = Parser(test_config)
+    test_config.data["discovery_rules"]["region_selector"] = "ul.late-list a"
+
+    html = """
+    <html><body>
+        <div class="region-list"><a href="/region/default">Default Region</a></div>
+        <ul class="late-list"><a href="/region/late">Late Region</a></ul>
+    </body></html>
+    """
+
+    regions = parser.parse_region_index(html)
+
+    assert [region["name"] for region in regions] == ["Late Region"]
+
+
+def test_parse_region_index_with_complex_selector(test_config):
+    """
+    Test that selectors outside the "tag.class tag" shape use generic CSS matching.
+    """
+    test_config.data["discovery_rules"]["region_selector"] = "nav#regions > a.region"
+
+    parser = Parser(test_config)
+
+    html = """
+    <html><body>
+        <nav id="regions">
+            <a class="region" href="/region/kept">Kept Region</a>
+            <a href="/region/skipped">Skipped Region</a>
+        </nav>
+    </body></html>
+    """
+
+    regions = parser.parse_region_index(html)
+
+    assert regions.names == {"Kept Region"}
@@ -4,6 +4,7 @@ Tests parse_region_page() method in isolation.
 """
 
 import pytest
+from src.models import River
 from src.parser import Parser
 from tests.fixtures.sample_pages import (
     MINIMAL_REGION,
@@ -13,15 +14,14 @@ from tests.fixtures.sample_pages import (
     NO_MATCHES,
     EMPTY_HTML,
     SAMPLE_REGION_HTML,
+    parsed,
 )
 
 
-def test_parse_region_page_minimal(test_config, sample_region_data):
+def test_parse_region_page_minimal(parser, sample_region_data):
     """
     Test parsing minimal valid region page with 1 river.
     """
-    parser = Parser(test_config)
-
     # Create mock region object
     region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
 
@@ -35,12 +35,41 @@ def test_parse_region_page_minimal(test_config, sample_region_data):
     assert "slug" in river
 
 
-def test_parse_region_page_multiple(test_config):
+@pytest.mark.parametrize(
+    "fixture_name",
+    ["MINIMAL_REGION", "MULTIPLE_RIVERS", "DUPLICATE_LINKS", "INVALID_URLS", "EMPTY_HTML"],
+)
+def test_parse_region_tree_matches_parse_region_page(parser, fixture_name):
     """
-    Test parsing region page with multiple rivers.
+    Test that a pre-parsed tree yields the same rivers as parsing the raw page.
     """
-    parser = Parser(test_config)
+    region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
+    raw_html, tree = parsed(fixture_name)
+
+    assert parser.parse_region_tree(tree, region) == parser.parse_region_page(raw_html, region)
+
+
+def test_parse_region_page_returns_river_records(parser):
+    """
+    Test that rivers come back as slotted River records with dict-style access.
+    """
+    region = {"id": 7, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
+
+    river = parser.parse_region_page(MINIMAL_REGION, region)[0]
 
+    assert isinstance(river, River)
+    assert not hasattr(river, "__dict__")
+    assert river.region_id == 7
+    assert river["name"] == river.name == "Test River"
+    assert "slug" in river and "bogus" not in river
+    assert river.get("bogus", "default") == "default"
+    assert dict(river)["canonical_url"] == "/river/test-river"
+
+
+def test_parse_region_page_multiple(parser):
+    """
+    Test parsing region page with multiple rivers.
+    """
     region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
 
     rivers = parser.parse_region_page(MULTIPLE_RIVERS, region)
@@ -60,12 +89,10 @@ def test_parse_region_page_multiple(test_config):
         assert river["canonical_url"]  # Not empty
 
 
-def test_parse_region_page_sample_html(test_config):
+def test_parse_region_page_sample_html(parser):
     """
     Test parsing realistic sample region page.
     """
-    parser = Parser(test_config)
-
     region = {
         "id": 1,
         "name": "North Island",
@@ -82,12 +109,10 @@ def test_parse_region_page_sample_html(test_config):
     assert "Tongariro River" in names or "Rangitikei River" in names
 
 
-def test_parse_region_page_duplicate_links(test_config):
+def test_parse_region_page_duplicate_links(parser):
     """
     Test that duplicate river links are de-duplicated by canonical URL.
     """
-    parser = Parser(test_config)
-
     region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
 
     rivers = parser.parse_region_page(DUPLICATE_LINKS, region)
@@ -98,14 +123,12 @@ def test_parse_region_page_duplicate_links(test_config):
     assert len(urls) == len(rivers), "URLs not properly de-duplicated"
 
 
-def test_parse_region_page_invalid_urls(test_config):
+def test_parse_region_page_invalid_urls(parser):
     """
     Test that invalid/empty URLs are skipped gracefully.
 
     Article 4.4: Graceful handling of malformed data.
     """
-    parser = Parser(test_config)
-
     region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
 
     rivers = parser.parse_region_page(INVALID_URLS, region)
@@ -116,14 +139,30 @@ def test_parse_region_page_invalid_urls(test_config):
         assert river["canonical_url"] not in ["", "#"], "Invalid URL not filtered"
 
 
-def test_parse_region_page_no_matches(test_config):
+def test_parse_region_page_rejects_protocol_relative_urls(parser):
+    """
+    Test that "//host" links are not mistaken for site paths on this host.
+    """
+    region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
+    html = """
+    <div class="fishing-waters">
+        <a href="//evil.com/river/x">Offsite River</a>
+        <a href="/\\evil.com/river/y">Backslash River</a>
+        <a href="/river/z">Local River</a>
+    </div>
+    """
+
+    rivers = parser.parse_region_page(html, region)
+
+    assert [river["canonical_url"] for river in rivers] == ["/river/z"]
+
+
+def test_parse_region_page_no_matches(parser):
     """
     Test parsing HTML with no matching selectors.
 
     Edge Case: "Fishing Waters" section missing.
     """
-    parser = Parser(test_config)
-
     region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
 
     rivers = parser.parse_region_page(NO_MATCHES, region)
@@ -132,12 +171,10 @@ def test_parse_region_page_no_matches(test_config):
     assert rivers == [], f"Expected empty list for no matches, got {rivers}"
 
 
-def test_parse_region_page_empty_html(test_config):
+def test_parse_region_page_empty_html(parser):
     """
     Test parsing completely empty HTML.
     """
-    parser = Parser(test_config)
-
     region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
 
     rivers = parser.parse_region_page(EMPTY_HTML, region)
@@ -145,12 +182,10 @@ def test_parse_region_page_empty_html(test_config):
     assert rivers == [], f"Expected empty list for empty HTML, got {rivers}"
 
 
-def test_parse_region_page_slug_generation(test_config):
+def test_parse_region_page_slug_generation(parser):
     """
     Test that slugs are properly generated from names or URLs.
     """
-    parser = Parser(test_config)
-
     region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
 
     rivers = parser.parse_region_page(MULTIPLE_RIVERS, region)
@@ -162,12 +197,54 @@ def test_parse_region_page_slug_generation(test_config):
         assert " " not in slug, f"Slug '{slug}' contains spaces"
 
 
-def test_parse_region_page_region_context(test_config):
+@pytest.mark.parametrize(
+    "raw_slug, expected",
+    [
+        ("Rock & Roll", "rock-roll"),
+        ("Test  River", "test-river"),
+        ("-lead-", "lead"),
+        ("Māori", "maori"),
+        ("caf%C3%A9", "cafe"),
+        ("河", "%e6%b2%b3"),
+        ("%E6%B2%B3", "%e6%b2%b3"),
+    ],
+)
+def test_parse_region_page_slug_normalization(parser, raw_slug, expected):
     """
-    Test that parser has access to region context (for logging/debugging).
+    Test that separator runs collapse and accented/percent-encoded letters keep their base.
     """
-    parser = Parser(test_config)
+    region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
+    html = (
+        '<div class="fishing-waters">'
+        f'<a href="/river/x" data-slug="{raw_slug}">River X</a>'
+        "</div>"
+    )
+
+    rivers = parser.parse_region_page(html, region)
+
+    assert [river["slug"] for river in rivers] == [expected]
 
+
+def test_parse_region_page_ignores_script_text(parser):
+    """
+    Test that inline <script> content inside a river link is not part of its name.
+    """
+    region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
+    html = (
+        '<div class="fishing-waters">'
+        '<a href="/river/x">River X<script>document.write("ad")</script></a>'
+        "</div>"
+    )
+
+    rivers = parser.parse_region_page(html, region)
+
+    assert [river["name"] for river in rivers] == ["River X"]
+
+
+def test_parse_region_page_region_context(parser):
+    """
+    Test that parser has access to region context (for logging/debugging).
+    """
     region = {
         "id": 42,
         "name": "Context Region",
@@ -207,14 +284,55 @@ def test_parse_region_page_with_custom_selector(test_config):
     assert rivers[0]["name"] == "Custom River"
 
 
-def test_parse_region_page_no_inference(test_config):
+def test_parse_region_page_selector_changed_after_init(test_config):
+    """
+    Test that a river selector edited after the parser is created still applies.
+    """
+    parser = Parser(test_config)
+    test_config.data["discovery_rules"]["river_selector"] = "ul.late-rivers a"
+
+    region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
+
+    html = """
+    <html><body>
+        <div class="fishing-waters"><a href="/river/default">Default River</a></div>
+        <ul class="late-rivers"><a href="/river/late">Late River</a></ul>
+    </body></html>
+    """
+
+    rivers = parser.parse_region_page(html, region)
+
+    assert [river["name"] for river in rivers] == ["Late River"]
+
+
+def test_parse_region_page_nested_containers(parser):
+    """
+    Test that links inside nested river containers are returned once, in page order.
+    """
+    region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
+
+    html = """
+    <html><body>
+        <section class="fishing-waters">
+            <a href="/river/first">First River</a>
+            <div class="fishing-waters"><a href="/river/inner">Inner River</a></div>
+            <a href="/river/last">Last River</a>
+        </section>
+        <a href="/river/outside">Outside River</a>
+    </body></html>
+    """
+
+    rivers = parser.parse_region_page(html, region)
+
+    assert [river["name"] for river in rivers] == ["First River", "Inner River", "Last River"]
+
+
+def test_parse_region_page_no_inference(parser):
     """
     Test that parser only extracts explicit content, no inference.
 
     Article 5.2: No inference or fabrication.
     """
-    parser = Parser(test_config)
-
     region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
 
     # Use minimal HTML with only name and URL
@@ -239,14 +357,12 @@ def test_parse_region_page_no_inference(test_config):
     # (Section info will come from detail pages in US3)
 
 
-def test_parse_region_page_special_characters(test_config):
+def test_parse_region_page_special_characters(parser):
     """
     Test parsing river names with special characters (Māori names).
 
     Article 5.3: No encoding assumptions.
     """
-    parser = Parser(test_config)
-
     region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
 
     # Create test HTML with Māori characters
@@ -266,12 +382,10 @@ def test_parse_region_page_special_characters(test_config):
     assert "Whanganui (Te Awa Tupua)" in names, "Special characters not preserved"
 
 
-def test_parse_region_page_nested_structure(test_config):
+def test_parse_region_page_nested_structure(parser):
     """
     Test parsing complex nested HTML structure.
     """
-    parser = Parser(test_config)
-
     region = {"id": 1, "name": "Test Region", "canonical_url": "http://example.com/region/test"}
 
     from tests.fixtures.sample_pages import NESTED_HTML
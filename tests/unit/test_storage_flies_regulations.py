@@ -4,25 +4,33 @@ Tests fly and regulation insert, get, FK validation, and raw data immutability.
 """
 
 import pytest
-from src.storage import Storage
-
-
-def test_insert_fly(test_storage, sample_region_data):
+from src.exceptions import StorageError
+from src.storage import Storage, content_hash
+
+
+@pytest.fixture
+def river_fixture(test_storage, sample_region_data):
+    """Insert a region and one river in a single transaction; returns (region_id, river_id)."""
+    with test_storage.transaction():
+        region_id = test_storage.insert_region(sample_region_data)
+        river_id = test_storage.insert_river(
+            {
+                "region_id": region_id,
+                "name": "Test River",
+                "slug": "test-river",
+                "canonical_url": "http://example.com/river/test",
+                "raw_html": "",
+                "crawl_timestamp": "2024-01-15T12:00:00Z",
+            }
+        )
+    return region_id, river_id
+
+
+def test_insert_fly(test_storage, river_fixture):
     """
     Test basic fly insertion with river FK.
     """
-    # Insert region and river first
-    region_id = test_storage.insert_region(sample_region_data)
-    river_id = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "Test River",
-            "slug": "test-river",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+    _, river_id = river_fixture
 
     # Insert fly
     fly_id = test_storage.insert_fly(
@@ -41,22 +49,11 @@ def test_insert_fly(test_storage, sample_region_data):
     assert fly_id > 0
 
 
-def test_get_flies_by_river(test_storage, sample_region_data):
+def test_get_flies_by_river(test_storage, river_fixture):
     """
     Test retrieving flies by river ID.
     """
-    # Insert region and river
-    region_id = test_storage.insert_region(sample_region_data)
-    river_id = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "Test River",
-            "slug": "test",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+    _, river_id = river_fixture
 
     # Insert multiple flies
     test_storage.insert_fly(
@@ -85,24 +82,66 @@ def test_get_flies_by_river(test_storage, sample_region_data):
     assert names == {"Fly 1", "Fly 2"}
 
 
-def test_insert_fly_with_null_fields(test_storage, sample_region_data):
+def test_batch_insert_flies(test_storage, river_fixture):
+    """
+    Test batch fly insert returns ids in input order.
+    """
+    _, river_id = river_fixture
+
+    fly_ids = test_storage.batch_insert_flies(
+        [
+            {
+                "river_id": river_id,
+                "name": f"Fly {n}",
+                "raw_text": f"Fly {n} description",
+                "crawl_timestamp": "2024-01-15T12:00:00Z",
+            }
+            for n in range(3)
+        ]
+    )
+
+    flies = test_storage.get_flies_by_river(river_id)
+    assert [f["id"] for f in flies] == fly_ids
+    assert [f["name"] for f in flies] == ["Fly 0", "Fly 1", "Fly 2"]
+    assert test_storage.batch_insert_flies([]) == []
+
+
+def test_batch_insert_flies_rejects_id_gap(test_storage, river_fixture):
+    """
+    Test that a batch whose ids are not consecutive is rolled back, not mis-numbered.
+    """
+    _, river_id = river_fixture
+    # Silently drops one row, leaving a gap in the AUTOINCREMENT range
+    test_storage.conn.execute("""
+        CREATE TEMP TRIGGER skip_fly BEFORE INSERT ON main.recommended_flies
+        WHEN NEW.name = 'Skipped' BEGIN SELECT RAISE(IGNORE); END
+        """)
+    try:
+        with pytest.raises(StorageError, match="non-consecutive ids"):
+            test_storage.batch_insert_flies(
+                [
+                    {
+                        "river_id": river_id,
+                        "name": name,
+                        "raw_text": name,
+                        "crawl_timestamp": "2024-01-15T12:00:00Z",
+                    }
+                    for name in ("Kept", "Skipped", "Kept too")
+                ]
+            )
+    finally:
+        test_storage.conn.execute("DROP TRIGGER skip_fly")
+
+    assert test_storage.get_flies_by_river(river_id) == []
+
+
+def test_insert_fly_with_null_fields(test_storage, river_fixture):
     """
     Test that uncertain fly fields can be null (no inference).
 
     Article 5.2: No inference.
     """
-    # Insert region and river
-    region_id = test_storage.insert_region(sample_region_data)
-    river_id = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "Test River",
-            "slug": "test",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+    _, river_id = river_fixture
 
     # Insert fly with null category/size/color
     fly_id = test_storage.insert_fly(
@@ -126,22 +165,11 @@ def test_insert_fly_with_null_fields(test_storage, sample_region_data):
     assert fly["color"] is None
 
 
-def test_insert_regulation(test_storage, sample_region_data):
+def test_insert_regulation(test_storage, river_fixture):
     """
     Test basic regulation insertion with river FK.
     """
-    # Insert region and river
-    region_id = test_storage.insert_region(sample_region_data)
-    river_id = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "Test River",
-            "slug": "test",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+    _, river_id = river_fixture
 
     # Insert regulation
     reg_id = test_storage.insert_regulation(
@@ -158,22 +186,11 @@ def test_insert_regulation(test_storage, sample_region_data):
     assert reg_id > 0
 
 
-def test_get_regulations_by_river(test_storage, sample_region_data):
+def test_get_regulations_by_river(test_storage, river_fixture):
     """
     Test retrieving regulations by river ID.
     """
-    # Insert region and river
-    region_id = test_storage.insert_region(sample_region_data)
-    river_id = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "Test River",
-            "slug": "test",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+    _, river_id = river_fixture
 
     # Insert multiple regulations
     test_storage.insert_regulation(
@@ -204,24 +221,42 @@ def test_get_regulations_by_river(test_storage, sample_region_data):
     assert types == {"catch_limit", "season_dates"}
 
 
-def test_fly_cascade_delete_on_river_delete(test_storage, sample_region_data):
+def test_batch_insert_regulations_is_atomic(test_storage, river_fixture):
+    """
+    Test that a failing regulation leaves none of the batch behind.
+    """
+    _, river_id = river_fixture
+
+    with pytest.raises(StorageError):
+        test_storage.batch_insert_regulations(
+            [
+                {
+                    "river_id": river_id,
+                    "type": "catch_limit",
+                    "value": "2 fish",
+                    "raw_text": "Catch limit: 2 fish per day",
+                    "crawl_timestamp": "2024-01-15T12:00:00Z",
+                },
+                {
+                    "river_id": river_id + 1000,  # No such river (FK violation)
+                    "type": "method",
+                    "value": "Fly only",
+                    "raw_text": "Fly fishing only",
+                    "crawl_timestamp": "2024-01-15T12:00:00Z",
+                },
+            ]
+        )
+
+    assert test_storage.get_regulations_by_river(river_id) == []
+
+
+def test_fly_cascade_delete_on_river_delete(test_storage, river_fixture):
     """
     Test that deleting river cascades to flies.
 
     ON DELETE CASCADE enforcement.
     """
-    # Insert region and river
-    region_id = test_storage.insert_region(sample_region_data)
-    river_id = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "Test River",
-            "slug": "test",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+    _, river_id = river_fixture
 
     # Insert fly
     fly_id = test_storage.insert_fly(
@@ -239,29 +274,17 @@ def test_fly_cascade_delete_on_river_delete(test_storage, sample_region_data):
 
     # Delete river using the same connection
     cursor = test_storage.conn.execute("DELETE FROM rivers WHERE id = ?", (river_id,))
-    test_storage.conn.commit()
 
     # Verify flies deleted (CASCADE)
     flies_after = test_storage.get_flies_by_river(river_id)
     assert len(flies_after) == 0
 
 
-def test_regulation_cascade_delete_on_river_delete(test_storage, sample_region_data):
+def test_regulation_cascade_delete_on_river_delete(test_storage, river_fixture):
     """
     Test that deleting river cascades to regulations.
     """
-    # Insert region and river
-    region_id = test_storage.insert_region(sample_region_data)
-    river_id = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "Test River",
-            "slug": "test",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+    _, river_id = river_fixture
 
     # Insert regulation
     reg_id = test_storage.insert_regulation(
@@ -280,31 +303,37 @@ def test_regulation_cascade_delete_on_river_delete(test_storage, sample_region_d
 
     # Delete river using the same connection
     cursor = test_storage.conn.execute("DELETE FROM rivers WHERE id = ?", (river_id,))
-    test_storage.conn.commit()
 
     # Verify regulations deleted (CASCADE)
     regs_after = test_storage.get_regulations_by_river(river_id)
     assert len(regs_after) == 0
 
 
-def test_insert_metadata(test_storage, sample_region_data):
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * FROM recommended_flies WHERE river_id = 1",
+        "SELECT * FROM regulations WHERE river_id = 1",
+        "SELECT * FROM recommended_flies WHERE section_id = 1",
+        "SELECT * FROM regulations WHERE section_id = 1",
+    ],
+)
+def test_child_lookups_use_index(test_storage, query):
+    """
+    Test that FK lookups (getters and ON DELETE CASCADE) search an index, not the table.
+    """
+    plan = test_storage.conn.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+
+    assert all("USING INDEX" in row["detail"] for row in plan)
+
+
+def test_insert_metadata(test_storage, river_fixture):
     """
     Test metadata insertion for change detection.
 
     Article 6.2: Metadata versioning.
     """
-    # Insert region and river
-    region_id = test_storage.insert_region(sample_region_data)
-    river_id = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "Test River",
-            "slug": "test",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+    _, river_id = river_fixture
 
     # Insert metadata
     metadata_id = test_storage.insert_metadata(
@@ -320,23 +349,34 @@ def test_insert_metadata(test_storage, sample_region_data):
     assert metadata_id is not None
 
 
-def test_get_metadata_by_entity(test_storage, sample_region_data):
+def test_content_hash_detects_change(test_storage, river_fixture):
     """
-    Test retrieving metadata by entity.
+    Test that content_hash feeds has_changed: same page unchanged, edited page changed.
     """
-    # Insert region and river
-    region_id = test_storage.insert_region(sample_region_data)
-    river_id = test_storage.insert_river(
+    _, river_id = river_fixture
+    page = "<html><body>Tongariro – Māori place names</body></html>"
+
+    test_storage.insert_metadata(
         {
-            "region_id": region_id,
-            "name": "Test River",
-            "slug": "test",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "",
+            "session_id": "test-session-001",
+            "entity_id": river_id,
+            "entity_type": "river",
+            "raw_content_hash": content_hash(page),
             "crawl_timestamp": "2024-01-15T12:00:00Z",
         }
     )
 
+    assert len(content_hash(page)) == 32
+    assert not test_storage.has_changed("river", river_id, content_hash(page))
+    assert test_storage.has_changed("river", river_id, content_hash(page + " "))
+
+
+def test_get_metadata_by_entity(test_storage, river_fixture):
+    """
+    Test retrieving metadata by entity.
+    """
+    _, river_id = river_fixture
+
     # Insert metadata
     test_storage.insert_metadata(
         {
@@ -355,24 +395,13 @@ def test_get_metadata_by_entity(test_storage, sample_region_data):
     assert metadata["raw_content_hash"] == "abc123"
 
 
-def test_fly_raw_text_immutability(test_storage, sample_region_data):
+def test_fly_raw_text_immutability(test_storage, river_fixture):
     """
     Test that raw_text is preserved (immutability).
 
     Article 6.1: Raw data immutability.
     """
-    # Insert region and river
-    region_id = test_storage.insert_region(sample_region_data)
-    river_id = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "Test River",
-            "slug": "test",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+    _, river_id = river_fixture
 
     # Insert fly with raw_text
     original_raw = "Pheasant Tail Nymph #16 Brown"
@@ -26,6 +26,52 @@ def test_insert_region(test_storage):
     assert region_id > 0
 
 
+def test_storage_requires_returning_support(test_logger, monkeypatch):
+    """
+    Test that an SQLite without INSERT ... RETURNING is rejected up front.
+    """
+    monkeypatch.setattr("src.storage.sqlite3.sqlite_version_info", (3, 34, 1))
+
+    with pytest.raises(StorageError, match="3.35.0"):
+        Storage(":memory:", test_logger)
+
+
+def test_storage_connection_pragmas(tmp_path, test_logger):
+    """
+    Test that a file-backed database runs in WAL mode with relaxed fsync.
+    """
+    storage = Storage(str(tmp_path / "pragmas.db"), test_logger)
+
+    def pragma(name):
+        return storage.conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+    try:
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("foreign_keys") == 1
+        assert pragma("cache_size") == -64000
+    finally:
+        storage.close()
+
+
+@pytest.mark.parametrize("persistent", [False, True])
+def test_close_optimizes_only_persistent_databases(tmp_path, test_logger, monkeypatch, persistent):
+    """
+    Test that close() runs PRAGMA optimize for real databases but not temp ones.
+    """
+    if persistent:
+        # Pretend tmp_path lives outside the system temp dir
+        monkeypatch.setattr("src.storage.tempfile.gettempdir", lambda: str(tmp_path / "elsewhere"))
+    storage = Storage(str(tmp_path / "optimize.db"), test_logger)
+    statements = []
+    storage.conn.set_trace_callback(statements.append)
+
+    storage.close()
+    storage.close()  # Second close is a no-op
+
+    assert statements.count("PRAGMA optimize") == int(persistent)
+
+
 def test_get_region(test_storage):
     """
     Test retrieving region by ID.
@@ -60,6 +106,13 @@ def test_get_region_not_found(test_storage):
     assert region is None
 
 
+def test_delete_region_not_found(test_storage):
+    """
+    Test deleting non-existent region reports nothing deleted.
+    """
+    assert test_storage.delete_region(9999) is False
+
+
 def test_get_regions(test_storage):
     """
     Test retrieving all regions.
@@ -223,6 +276,31 @@ def test_batch_insert_regions(test_storage):
     assert test_storage.count_regions() == 2
 
 
+def test_batch_insert_regions_is_atomic(test_storage):
+    """
+    Test that a failing row rolls back the rows inserted before it.
+    """
+    regions_data = [
+        {
+            "name": "Batch Region 1",
+            "slug": "batch-1",
+            "canonical_url": "http://example.com/batch/1",
+            "crawl_timestamp": "2024-01-15T12:00:00Z",
+        },
+        {
+            "name": "Batch Region 2",
+            "slug": None,  # Passes insert_region's checks, violates NOT NULL in SQLite
+            "canonical_url": "http://example.com/batch/2",
+            "crawl_timestamp": "2024-01-15T12:00:00Z",
+        },
+    ]
+
+    with pytest.raises(StorageError, match="NOT NULL"):
+        test_storage.batch_insert_regions(regions_data)
+
+    assert test_storage.count_regions() == 0
+
+
 def test_get_uncrawled_regions(test_storage):
     """
     Test querying regions without crawl timestamps.
@@ -4,51 +4,26 @@ Tests River insert, get, update, FK validation, and cascade delete.
 """
 
 import pytest
+from src.models import River
 from src.storage import Storage
 from src.exceptions import StorageError
+from tests.helpers import make_river
 
 
-def test_insert_river(test_storage, sample_region_data):
+def test_insert_and_read_river(test_storage, sample_region_data):
     """
-    Test basic river insertion with valid region FK.
+    Test river insertion with valid region FK, retrieval by ID, and timestamps.
     """
-    # Insert region first
+    # Insert region and river
     region_id = test_storage.insert_region(sample_region_data)
 
-    # Insert river
     river_id = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "Test River",
-            "slug": "test-river",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "<html>river</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
+        make_river(region_id, raw_html="<html>river</html>", crawl_timestamp="2024-01-15T12:00:00Z")
     )
 
     assert river_id is not None
     assert river_id > 0
 
-
-def test_get_river(test_storage, sample_region_data):
-    """
-    Test retrieving river by ID.
-    """
-    # Insert region and river
-    region_id = test_storage.insert_region(sample_region_data)
-
-    river_id = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "Test River",
-            "slug": "test-river",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "<html>river</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
-
     # Retrieve river
     river = test_storage.get_river(river_id)
 
@@ -58,6 +33,32 @@ def test_get_river(test_storage, sample_region_data):
     assert river["name"] == "Test River"
     assert river["slug"] == "test-river"
     assert river["canonical_url"] == "http://example.com/river/test"
+    assert river["raw_html"] == "<html>river</html>"
+    assert river["crawl_timestamp"] == "2024-01-15T12:00:00Z"
+
+    # created_at and updated_at are set automatically
+    assert river["created_at"] is not None
+    assert river["updated_at"] is not None
+
+
+def test_insert_river_record(test_storage, sample_region_data):
+    """
+    Test that a River record (as returned by the parser) is stored like a dict.
+    """
+    region_id = test_storage.insert_region(sample_region_data)
+    river = River(
+        name="Test River",
+        slug="test-river",
+        canonical_url="http://example.com/river/test",
+        region_id=region_id,
+        crawl_timestamp="2024-01-15T12:00:00Z",
+    )
+
+    river_id = test_storage.insert_river(river)
+
+    stored = test_storage.get_river(river_id)
+    assert stored["name"] == river.name
+    assert stored["region_id"] == region_id
 
 
 def test_get_river_not_found(test_storage):
@@ -72,87 +73,72 @@ def test_get_rivers(test_storage, sample_region_data):
     """
     Test retrieving all rivers.
     """
-    # Insert region
-    region_id = test_storage.insert_region(sample_region_data)
-
-    # Insert multiple rivers
-    test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "River 1",
-            "slug": "river-1",
-            "canonical_url": "http://example.com/river/1",
-            "raw_html": "<html>1</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
-
-    test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "River 2",
-            "slug": "river-2",
-            "canonical_url": "http://example.com/river/2",
-            "raw_html": "<html>2</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+    with test_storage.transaction():
+        # Insert region
+        region_id = test_storage.insert_region(sample_region_data)
+
+        # Insert multiple rivers
+        test_storage.batch_insert_rivers(
+            [
+                make_river(
+                    region_id,
+                    name="River 1",
+                    slug="river-1",
+                    canonical_url="http://example.com/river/1",
+                ),
+                make_river(
+                    region_id,
+                    name="River 2",
+                    slug="river-2",
+                    canonical_url="http://example.com/river/2",
+                ),
+            ]
+        )
 
     # Retrieve all
     rivers = test_storage.get_rivers()
 
     assert len(rivers) == 2
-    names = {r["name"] for r in rivers}
-    assert names == {"River 1", "River 2"}
+    assert sorted(r["name"] for r in rivers) == ["River 1", "River 2"]
 
 
 def test_get_rivers_by_region(test_storage, sample_region_data):
     """
     Test retrieving rivers for specific region.
     """
-    # Insert two regions
-    region_id_1 = test_storage.insert_region(sample_region_data)
-
-    region_data_2 = sample_region_data.copy()
-    region_data_2["name"] = "Region 2"
-    region_data_2["slug"] = "region-2"
-    region_data_2["canonical_url"] = "http://example.com/region/2"
-    region_id_2 = test_storage.insert_region(region_data_2)
-
-    # Insert rivers in region 1
-    test_storage.insert_river(
-        {
-            "region_id": region_id_1,
-            "name": "River 1A",
-            "slug": "river-1a",
-            "canonical_url": "http://example.com/river/1a",
-            "raw_html": "<html>1a</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
-
-    test_storage.insert_river(
-        {
-            "region_id": region_id_1,
-            "name": "River 1B",
-            "slug": "river-1b",
-            "canonical_url": "http://example.com/river/1b",
-            "raw_html": "<html>1b</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
-
-    # Insert river in region 2
-    test_storage.insert_river(
-        {
-            "region_id": region_id_2,
-            "name": "River 2A",
-            "slug": "river-2a",
-            "canonical_url": "http://example.com/river/2a",
-            "raw_html": "<html>2a</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+    with test_storage.transaction():
+        # Insert two regions
+        region_id_1 = test_storage.insert_region(sample_region_data)
+
+        region_data_2 = sample_region_data.copy()
+        region_data_2["name"] = "Region 2"
+        region_data_2["slug"] = "region-2"
+        region_data_2["canonical_url"] = "http://example.com/region/2"
+        region_id_2 = test_storage.insert_region(region_data_2)
+
+        # Insert two rivers in region 1 and one in region 2
+        test_storage.batch_insert_rivers(
+            [
+                make_river(
+                    region_id_1,
+                    name="River 1A",
+                    slug="river-1a",
+                    canonical_url="http://example.com/river/1a",
+                ),
+                make_river(
+                    region_id_1,
+                    name="River 1B",
+                    slug="river-1b",
+                    canonical_url="http://example.com/river/1b",
+                ),
+                make_river(
+                    region_id_2,
+                    name="River 2A",
+                    slug="river-2a",
+                    canonical_url="http://example.com/river/2a",
+                ),
+            ]
+        )
 
     # Query rivers by region
     rivers_region_1 = test_storage.get_rivers_by_region(region_id_1)
@@ -161,154 +147,167 @@ def test_get_rivers_by_region(test_storage, sample_region_data):
     assert len(rivers_region_1) == 2
     assert len(rivers_region_2) == 1
 
-    names_1 = {r["name"] for r in rivers_region_1}
-    assert names_1 == {"River 1A", "River 1B"}
+    assert sorted(r["name"] for r in rivers_region_1) == ["River 1A", "River 1B"]
 
 
-def test_insert_river_duplicate_canonical_url(test_storage, sample_region_data):
+@pytest.fixture(scope="class")
+def region_pair(session_storage, sample_region_data):
     """
-    Test that inserting river with duplicate canonical_url updates, not duplicates.
+    Two regions inserted once per test class.
 
-    Article 6.4: Upsert pattern for immutability.
-    """
-    # Insert region
-    region_id = test_storage.insert_region(sample_region_data)
+    The inserts run inside a transaction on the session database that is
+    rolled back after the class; each test's test_storage scope nests
+    inside it as a SAVEPOINT. A test that ends this scope (commit or
+    rollback past its own) takes the regions with it, so teardown fails.
 
-    # First insert
-    river_id_1 = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "Original Name",
-            "slug": "original-slug",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "<html>original</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
-
-    # Second insert with same canonical_url
-    river_id_2 = test_storage.insert_river(
+    Returns:
+        Tuple of (region_id_1, region_id_2)
+    """
+    session_storage.begin_transaction()
+    depth = session_storage.transaction_depth
+    region_id_1 = session_storage.insert_region(sample_region_data)
+    region_id_2 = session_storage.insert_region(
         {
-            "region_id": region_id,
-            "name": "Updated Name",
-            "slug": "updated-slug",
-            "canonical_url": "http://example.com/river/test",  # Same URL
-            "raw_html": "<html>updated</html>",
-            "crawl_timestamp": "2024-01-15T13:00:00Z",
+            **sample_region_data,
+            "name": "Region 2",
+            "slug": "region-2",
+            "canonical_url": "http://example.com/region/2",
         }
     )
-
-    # Should return same ID (upsert)
-    assert river_id_1 == river_id_2
-
-    # Verify only 1 river exists
-    rivers = test_storage.get_rivers()
-    assert len(rivers) == 1
-
-    # Verify updated fields
-    river = rivers[0]
-    assert river["name"] == "Updated Name"
-
-
-def test_insert_river_invalid_region_fk(test_storage):
-    """
-    Test that inserting river with invalid region_id raises error.
-
-    Foreign key constraint enforcement.
-    """
-    with pytest.raises(Exception):  # SQLite raises IntegrityError
-        test_storage.insert_river(
-            {
-                "region_id": 9999,  # Non-existent region
-                "name": "Orphan River",
-                "slug": "orphan",
-                "canonical_url": "http://example.com/river/orphan",
-                "raw_html": "<html>orphan</html>",
-                "crawl_timestamp": "2024-01-15T12:00:00Z",
-            }
+    yield region_id_1, region_id_2
+    end_depth = session_storage.transaction_depth
+    while session_storage.transaction_depth >= depth:
+        session_storage.rollback()
+    if end_depth != depth:
+        pytest.fail(
+            f"region_pair scope was left at transaction depth {end_depth}, expected {depth}; "
+            "a test in the class committed or rolled back past its own scope"
         )
 
 
-def test_insert_river_unique_slug_within_region(test_storage, sample_region_data):
+class TestRiverConstraints:
     """
-    Test that same slug with different canonical_url in same region fails.
-
-    UNIQUE(region_id, slug) constraint.
+    Upsert, FK and slug-uniqueness rules for rivers, sharing region_pair.
     """
-    # Insert region
-    region_id = test_storage.insert_region(sample_region_data)
 
-    # Insert first river
-    test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "River 1",
-            "slug": "test",  # Same slug
-            "canonical_url": "http://example.com/river/test-1",
-            "raw_html": "<html>1</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
-
-    # Insert second river with same slug in same region
-    with pytest.raises(Exception):  # SQLite raises IntegrityError
-        test_storage.insert_river(
-            {
-                "region_id": region_id,
-                "name": "River 2",
-                "slug": "test",  # Same slug
-                "canonical_url": "http://example.com/river/test-2",  # Different URL
-                "raw_html": "<html>2</html>",
-                "crawl_timestamp": "2024-01-15T12:00:00Z",
-            }
+    def test_insert_river_duplicate_canonical_url(self, test_storage, region_pair):
+        """
+        Test that inserting river with duplicate canonical_url updates, not duplicates.
+
+        Article 6.4: Upsert pattern for immutability.
+        """
+        region_id, _ = region_pair
+
+        # First insert
+        river_id_1 = test_storage.insert_river(
+            make_river(
+                region_id,
+                name="Original Name",
+                slug="original-slug",
+                raw_html="<html>original</html>",
+                crawl_timestamp="2024-01-15T12:00:00Z",
+            )
         )
 
+        # Second insert with same canonical_url
+        river_id_2 = test_storage.insert_river(
+            make_river(
+                region_id,
+                name="Updated Name",
+                slug="updated-slug",
+                raw_html="<html>updated</html>",
+                crawl_timestamp="2024-01-15T13:00:00Z",
+            )
+        )
 
-def test_insert_river_same_slug_different_regions(test_storage, sample_region_data):
-    """
-    Test that same slug in different regions is allowed.
-
-    Slug uniqueness is per-region, not global.
-    """
-    # Insert two regions
-    region_id_1 = test_storage.insert_region(sample_region_data)
-
-    region_data_2 = sample_region_data.copy()
-    region_data_2["name"] = "Region 2"
-    region_data_2["slug"] = "region-2"
-    region_data_2["canonical_url"] = "http://example.com/region/2"
-    region_id_2 = test_storage.insert_region(region_data_2)
-
-    # Insert river with same slug in region 1
-    river_id_1 = test_storage.insert_river(
-        {
-            "region_id": region_id_1,
-            "name": "River in Region 1",
-            "slug": "test",  # Same slug
-            "canonical_url": "http://example.com/river/1/test",
-            "raw_html": "<html>1</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+        # Should return same ID (upsert)
+        assert river_id_1 == river_id_2
+
+        # Verify only 1 river exists
+        rivers = test_storage.get_rivers()
+        assert len(rivers) == 1
+
+        # Verify updated fields
+        river = rivers[0]
+        assert river["name"] == "Updated Name"
+
+    def test_insert_river_invalid_region_fk(self, test_storage):
+        """
+        Test that inserting river with invalid region_id raises error.
+
+        Foreign key constraint enforcement.
+        """
+        with pytest.raises(StorageError, match="FOREIGN KEY"):
+            test_storage.insert_river(
+                make_river(
+                    9999,
+                    name="Orphan River",
+                    slug="orphan",
+                    canonical_url="http://example.com/river/orphan",
+                )
+            )
+
+    def test_insert_river_unique_slug_within_region(self, test_storage, region_pair):
+        """
+        Test that same slug with different canonical_url in same region fails.
+
+        UNIQUE(region_id, slug) constraint.
+        """
+        region_id, _ = region_pair
+
+        # Insert first river
+        test_storage.insert_river(
+            make_river(
+                region_id,
+                name="River 1",
+                slug="test",
+                canonical_url="http://example.com/river/test-1",
+            )
+        )
 
-    # Insert river with same slug in region 2 (should succeed)
-    river_id_2 = test_storage.insert_river(
-        {
-            "region_id": region_id_2,
-            "name": "River in Region 2",
-            "slug": "test",  # Same slug
-            "canonical_url": "http://example.com/river/2/test",
-            "raw_html": "<html>2</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+        # Insert second river with same slug in same region
+        with pytest.raises(StorageError, match="UNIQUE"):
+            test_storage.insert_river(
+                make_river(
+                    region_id,
+                    name="River 2",
+                    slug="test",
+                    canonical_url="http://example.com/river/test-2",
+                )
+            )
+
+    def test_insert_river_same_slug_different_regions(self, test_storage, region_pair):
+        """
+        Test that same slug in different regions is allowed.
+
+        Slug uniqueness is per-region, not global.
+        """
+        region_id_1, region_id_2 = region_pair
+
+        # Insert river with same slug in each region (should succeed)
+        river_id_1, river_id_2 = test_storage.batch_insert_rivers(
+            [
+                make_river(
+                    region_id_1,
+                    name="River in Region 1",
+                    slug="test",
+                    canonical_url="http://example.com/river/1/test",
+                ),
+                make_river(
+                    region_id_2,
+                    name="River in Region 2",
+                    slug="test",
+                    canonical_url="http://example.com/river/2/test",
+                ),
+            ]
+        )
 
-    # Should create separate rivers
-    assert river_id_1 != river_id_2
+        # Should create separate rivers
+        assert river_id_1 != river_id_2
 
-    # Verify 2 rivers exist
-    rivers = test_storage.get_rivers()
-    assert len(rivers) == 2
+        # Verify 2 rivers exist
+        rivers = test_storage.get_rivers()
+        assert len(rivers) == 2
 
 
 def test_count_rivers(test_storage, sample_region_data):
@@ -318,20 +317,21 @@ def test_count_rivers(test_storage, sample_region_data):
     # Initially empty
     assert test_storage.count_rivers() == 0
 
-    # Insert region
-    region_id = test_storage.insert_region(sample_region_data)
-
-    # Insert 3 rivers
-    for i in range(3):
-        test_storage.insert_river(
-            {
-                "region_id": region_id,
-                "name": f"River {i}",
-                "slug": f"river-{i}",
-                "canonical_url": f"http://example.com/river/{i}",
-                "raw_html": f"<html>{i}</html>",
-                "crawl_timestamp": "2024-01-15T12:00:00Z",
-            }
+    with test_storage.transaction():
+        # Insert region
+        region_id = test_storage.insert_region(sample_region_data)
+
+        # Insert 3 rivers
+        test_storage.batch_insert_rivers(
+            [
+                make_river(
+                    region_id,
+                    name=f"River {i}",
+                    slug=f"river-{i}",
+                    canonical_url=f"http://example.com/river/{i}",
+                )
+                for i in range(3)
+            ]
         )
 
     assert test_storage.count_rivers() == 3
@@ -345,22 +345,18 @@ def test_batch_insert_rivers(test_storage, sample_region_data):
     region_id = test_storage.insert_region(sample_region_data)
 
     rivers_data = [
-        {
-            "region_id": region_id,
-            "name": "Batch River 1",
-            "slug": "batch-1",
-            "canonical_url": "http://example.com/river/batch/1",
-            "raw_html": "<html>1</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        },
-        {
-            "region_id": region_id,
-            "name": "Batch River 2",
-            "slug": "batch-2",
-            "canonical_url": "http://example.com/river/batch/2",
-            "raw_html": "<html>2</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        },
+        make_river(
+            region_id,
+            name="Batch River 1",
+            slug="batch-1",
+            canonical_url="http://example.com/river/batch/1",
+        ),
+        make_river(
+            region_id,
+            name="Batch River 2",
+            slug="batch-2",
+            canonical_url="http://example.com/river/batch/2",
+        ),
     ]
 
     test_storage.batch_insert_rivers(rivers_data)
@@ -369,32 +365,34 @@ def test_batch_insert_rivers(test_storage, sample_region_data):
     assert test_storage.count_rivers() == 2
 
 
-def test_river_timestamps(test_storage, sample_region_data):
+def test_batch_insert_rivers_chunked_upsert(test_storage, sample_region_data, monkeypatch):
     """
-    Test that created_at and updated_at timestamps are set automatically.
+    Test that ids come back in input order across chunks, including upserts.
     """
-    # Insert region
+    monkeypatch.setattr(Storage, "_BATCH_RIVER_ROWS", 2)
     region_id = test_storage.insert_region(sample_region_data)
+    existing_id = test_storage.insert_river(
+        make_river(region_id, name="River 3", slug="river-3", canonical_url="http://x/3")
+    )
 
-    # Insert river
-    river_id = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "Test River",
-            "slug": "test",
-            "canonical_url": "http://example.com/river/test",
-            "raw_html": "<html>test</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
+    rivers = [
+        make_river(region_id, name=f"River {i}", slug=f"river-{i}", canonical_url=f"http://x/{i}")
+        for i in (5, 4, 3, 2, 1)
+    ]
+    rivers.append(
+        make_river(region_id, name="River 5b", slug="river-5", canonical_url="http://x/5")
     )
 
-    river = test_storage.get_river(river_id)
+    river_ids = test_storage.batch_insert_rivers(rivers)
 
-    # Verify timestamps exist
-    assert "created_at" in river
-    assert "updated_at" in river
-    assert river["created_at"] is not None
-    assert river["updated_at"] is not None
+    assert test_storage.count_rivers() == 5
+    assert river_ids[2] == existing_id
+    assert river_ids[5] == river_ids[0]
+    assert [test_storage.get_river(i)["canonical_url"] for i in river_ids[:5]] == [
+        river["canonical_url"] for river in rivers[:5]
+    ]
+    assert test_storage.get_river(river_ids[0])["name"] == "River 5b"
+    assert test_storage.batch_insert_rivers([]) == []
 
 
 def test_river_cascade_delete_on_region_delete(test_storage, sample_region_data):
@@ -403,43 +401,34 @@ def test_river_cascade_delete_on_region_delete(test_storage, sample_region_data)
 
     ON DELETE CASCADE enforcement.
     """
-    # Insert region
-    region_id = test_storage.insert_region(sample_region_data)
-
-    # Insert rivers
-    river_id_1 = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "River 1",
-            "slug": "river-1",
-            "canonical_url": "http://example.com/river/1",
-            "raw_html": "<html>1</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
-
-    river_id_2 = test_storage.insert_river(
-        {
-            "region_id": region_id,
-            "name": "River 2",
-            "slug": "river-2",
-            "canonical_url": "http://example.com/river/2",
-            "raw_html": "<html>2</html>",
-            "crawl_timestamp": "2024-01-15T12:00:00Z",
-        }
-    )
+    with test_storage.transaction():
+        # Insert region
+        region_id = test_storage.insert_region(sample_region_data)
+
+        # Insert rivers
+        river_id_1, river_id_2 = test_storage.batch_insert_rivers(
+            [
+                make_river(
+                    region_id,
+                    name="River 1",
+                    slug="river-1",
+                    canonical_url="http://example.com/river/1",
+                ),
+                make_river(
+                    region_id,
+                    name="River 2",
+                    slug="river-2",
+                    canonical_url="http://example.com/river/2",
+                ),
+            ]
+        )
 
     # Verify rivers exist
     assert test_storage.get_river(river_id_1) is not None
     assert test_storage.get_river(river_id_2) is not None
 
     # Delete region
-    import sqlite3
-
-    conn = sqlite3.connect(test_storage.db_path)
-    conn.execute("DELETE FROM regions WHERE id = ?", (region_id,))
-    conn.commit()
-    conn.close()
+    assert test_storage.delete_region(region_id)
 
     # Verify rivers deleted (CASCADE)
     assert test_storage.get_river(river_id_1) is None
@@ -0,0 +1,153 @@
+"""
+Unit test: Storage commit/rollback behaviour outside the test_storage savepoint.
+Uses a fresh in-memory Storage so the top-level BEGIN/COMMIT paths actually run.
+"""
+
+import pytest
+from src.exceptions import StorageError
+from src.storage import Storage
+from tests.helpers import make_river
+
+
+@pytest.fixture
+def storage(test_logger):
+    """Fresh in-memory Storage with no transaction open."""
+    storage = Storage(":memory:", test_logger)
+    yield storage
+    storage.close()
+
+
+def test_insert_after_bare_execute_commits(storage, sample_region_data):
+    """
+    Test that an implicit transaction from a bare conn.execute() does not swallow later commits.
+    """
+    storage.conn.execute("DELETE FROM regions WHERE id = 0")
+    assert storage.conn.in_transaction
+    assert storage.transaction_depth == 0
+
+    region_id = storage.insert_region(sample_region_data)
+
+    assert not storage.conn.in_transaction
+    storage.conn.rollback()
+    assert storage.get_region(region_id) is not None
+
+
+def test_nested_transaction_scopes(storage, sample_region_data):
+    """
+    Test that begin_transaction() nests and only the outermost commit() commits.
+    """
+    storage.begin_transaction()
+    storage.begin_transaction()
+    assert storage.transaction_depth == 2
+
+    region_id = storage.insert_region(sample_region_data)
+    storage.commit()
+
+    assert storage.transaction_depth == 1
+    assert storage.conn.in_transaction
+
+    storage.commit()
+
+    assert storage.transaction_depth == 0
+    assert not storage.conn.in_transaction
+    assert storage.get_region(region_id) is not None
+
+
+def test_plain_insert_commits(storage, sample_region_data):
+    """
+    Test that a single insert outside any scope is committed immediately.
+    """
+    region_id = storage.insert_region(sample_region_data)
+
+    assert not storage.conn.in_transaction
+    storage.conn.rollback()  # nothing left to undo
+    assert storage.get_region(region_id) is not None
+
+
+def test_failed_transaction_rolls_back(storage, sample_region_data):
+    """
+    Test that an exception inside transaction() undoes its writes and is re-raised.
+    """
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.insert_region(sample_region_data)
+            raise RuntimeError("abort")
+
+    assert not storage.conn.in_transaction
+    assert storage.transaction_depth == 0
+    assert storage.count_regions() == 0
+
+
+def test_failed_region_batch_leaves_no_rows(storage, sample_region_data):
+    """
+    Test that a region batch with one invalid row stores none of its rows.
+    """
+    bad_region = {**sample_region_data, "name": "", "canonical_url": "http://x/bad"}
+
+    with pytest.raises(StorageError):
+        storage.batch_insert_regions([sample_region_data, bad_region])
+
+    assert not storage.conn.in_transaction
+    assert storage.count_regions() == 0
+
+
+def test_failed_river_batch_leaves_no_rows(storage, sample_region_data):
+    """
+    Test that a river batch with one orphan row stores none of its rows.
+    """
+    region_id = storage.insert_region(sample_region_data)
+
+    with pytest.raises(StorageError):
+        storage.batch_insert_rivers(
+            [
+                make_river(region_id, slug="a", canonical_url="http://x/a"),
+                make_river(9999, slug="b", canonical_url="http://x/b"),
+            ]
+        )
+
+    assert not storage.conn.in_transaction
+    assert storage.count_rivers() == 0
+
+
+def test_failed_fly_batch_leaves_no_rows(storage, sample_region_data, sample_fly_data):
+    """
+    Test that a fly batch with one orphan row stores none of its rows.
+    """
+    region_id = storage.insert_region(sample_region_data)
+    river_id = storage.insert_river(make_river(region_id))
+
+    with pytest.raises(StorageError):
+        storage.batch_insert_flies(
+            [{**sample_fly_data, "river_id": river_id}, {**sample_fly_data, "river_id": 9999}]
+        )
+
+    assert not storage.conn.in_transaction
+    assert storage.get_flies_by_river(river_id) == []
+
+
+def test_failed_nested_transaction_keeps_outer_writes(storage, sample_region_data):
+    """
+    Test that a failing inner transaction() only rolls back to its own savepoint.
+    """
+    with storage.transaction():
+        region_id = storage.insert_region(sample_region_data)
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                storage.insert_river(make_river(region_id))
+                raise RuntimeError("abort")
+        assert storage.transaction_depth == 1
+
+    assert not storage.conn.in_transaction
+    assert storage.count_regions() == 1
+    assert storage.count_rivers() == 0
+
+
+def test_failed_plain_insert_rolls_back(storage):
+    """
+    Test that a failing insert outside any scope leaves no transaction open.
+    """
+    with pytest.raises(StorageError, match="FOREIGN KEY"):
+        storage.insert_river(make_river(9999))
+
+    assert not storage.conn.in_transaction
+    assert storage.count_rivers() == 0